@@ -1,33 +1,104 @@
 from __future__ import annotations
 
+import time
+
+_BOOT_T0 = time.perf_counter()
+
 import os
+import json
 import pathlib
+import importlib
+import importlib.util
+from contextlib import contextmanager
 from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional
 
-import boto3
-import botocore
-import pandas as pd
 import hashlib
 import re
 import zipfile
 import io
 import asyncio
+import sqlite3
+import threading
 import traceback
-from botocore.config import Config
-
-from bs4 import BeautifulSoup
+import gzip
+import urllib.parse
+import queue
+from collections import OrderedDict
 
 from shiny import App, reactive, render, ui
 
-# Optional shinywidgets
-try:
-    from shinywidgets import output_widget, render_widget
-    from shinywidgets import DataGrid
 
-    HAS_SHINYWIDGETS = True
-except Exception:
-    HAS_SHINYWIDGETS = False
+# ----------------- startup timing + lazy imports -----------------
+# Heavy deps (boto3/botocore, pandas, bs4) are imported on first use so a cold
+# worker can start serving before they are loaded; pandas/boto3 are warmed in a
+# background thread right after the app is built (_prewarm_imports). Every import
+# / init step is recorded here; see _startup_report().
+_STARTUP_TIMINGS: Dict[str, float] = {}
+
+
+@contextmanager
+def _timed(label: str):
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        _STARTUP_TIMINGS[label] = _STARTUP_TIMINGS.get(label, 0.0) + (time.perf_counter() - t0)
+
+
+_STARTUP_TIMINGS["import shiny + stdlib"] = time.perf_counter() - _BOOT_T0
+
+
+class _LazyModule:
+    """
+    Module proxy that imports on first attribute access.
+    Sub-modules resolve too, e.g. _LazyModule("botocore").exceptions.
+    """
+
+    def __init__(self, name: str):
+        self._name = name
+        self._mod = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._mod is None:
+            # the prewarm thread and the first session may race for it
+            with self._lock:
+                if self._mod is None:
+                    t0 = time.perf_counter()
+                    with _timed(f"lazy import {self._name}"):
+                        self._mod = importlib.import_module(self._name)
+                    if STARTUP_REPORT:
+                        print(
+                            f"[BOOT] lazy import {self._name}: {(time.perf_counter() - t0) * 1000:.1f} ms"
+                            f" ({threading.current_thread().name})"
+                        )
+        return self._mod
+
+    def __getattr__(self, attr: str):
+        mod = self._load()
+        try:
+            return getattr(mod, attr)
+        except AttributeError:
+            pass
+        sub = f"{self._name}.{attr}"
+        try:
+            return importlib.import_module(sub)
+        except ModuleNotFoundError as e:
+            # keep hasattr() / getattr(..., default) working for plain missing attributes
+            if e.name != sub:
+                raise
+            raise AttributeError(f"module {self._name!r} has no attribute {attr!r}") from None
+
+
+boto3 = _LazyModule("boto3")
+botocore = _LazyModule("botocore")
+pd = _LazyModule("pandas")
+np = _LazyModule("numpy")
+bs4 = _LazyModule("bs4")
+
+# Optional shinywidgets (only checks it is installed; nothing is imported)
+HAS_SHINYWIDGETS = importlib.util.find_spec("shinywidgets") is not None
 
 
 APP_TITLE = "RNA-Seq S3 Browser (Shiny for Python)"
@@ -36,6 +107,12 @@ DEFAULT_BUCKET = os.environ.get("RNASEQ_S3_BUCKET", "rnaseqdatabase")
 BASE_PREFIX = os.environ.get("RNASEQ_BASE_PREFIX", "vendor-data/")
 MAX_LIST_OBJECTS = int(os.environ.get("RNASEQ_MAX_LIST_OBJECTS", "5000"))
 
+# Listing backend: "live" (list_objects_v2) or "inventory" (S3 Inventory reports,
+# see the S3 Inventory section below)
+LISTING_BACKEND = os.environ.get("RNASEQ_LISTING_BACKEND", "live").strip().lower()
+FILTER_DEBOUNCE_SEC = float(os.environ.get("RNASEQ_FILTER_DEBOUNCE_SEC", "0.3"))
+TABLE_MAX_ROWS = int(os.environ.get("RNASEQ_TABLE_MAX_ROWS", "1000"))
+
 SUBFOLDER_CHOICES = {
     "(project root)": "(project root)",
     "Fastq/": "Fastq/",
@@ -47,15 +124,26 @@ SUBFOLDER_CHOICES = {
 
 # Where Shiny serves static files from
 APP_DIR = pathlib.Path(__file__).resolve().parent
-WWW_DIR = APP_DIR / "www"
+WWW_DIR = (APP_DIR / "www").resolve()
 WWW_DOWNLOADS_DIR = WWW_DIR / "downloads"
-WWW_DOWNLOADS_DIR.mkdir(parents=True, exist_ok=True)
 
 FASTQC_PREVIEW_BASE_URL = "/downloads"
 
 # Optional: keep local downloads too
 DOWNLOAD_DIR = pathlib.Path("./downloads").resolve()
-DOWNLOAD_DIR.mkdir(parents=True, exist_ok=True)
+
+# Warm cache of the last project listing per bucket (served on cold start)
+CACHE_DIR = pathlib.Path(os.environ.get("RNASEQ_CACHE_DIR", str(APP_DIR / ".cache"))).resolve()
+STARTUP_REPORT = os.environ.get("RNASEQ_STARTUP_REPORT", "") not in ("", "0", "false")
+# Import pandas/boto3 in a background thread once the app is built, so the first
+# session does not pay for them on the event loop
+PREWARM_IMPORTS = os.environ.get("RNASEQ_PREWARM", "1") not in ("", "0", "false")
+
+# Directories are created on first write instead of at import time. Not memoised:
+# scratch dirs (downloads, cache) may be cleaned up while the app is running.
+def _ensure_dir(path: pathlib.Path) -> pathlib.Path:
+    path.mkdir(parents=True, exist_ok=True)
+    return path
 
 
 # ----------------- helpers -----------------
@@ -72,14 +160,16 @@ def _local_html_name_for_key(key: str) -> str:
 
 
 def _make_s3(region: str):
-    cfg = Config(
+    cfg = botocore.config.Config(
         region_name=region,
         signature_version="s3v4",   # 🔥 REQUIRED
         connect_timeout=5,
         read_timeout=30,
         retries={"max_attempts": 3, "mode": "standard"},
     )
-    return boto3.session.Session().client("s3", config=cfg)
+    session_cls = boto3.session.Session  # lazy import happens here, timed separately
+    with _timed("create s3 client"):
+        return session_cls().client("s3", config=cfg)
 
 def _fastqc_local_name_for_key(key: str) -> str:
     # stable unique name per S3 key
@@ -103,6 +193,56 @@ def _filter_df_for_view(dff: pd.DataFrame, subfolder: str) -> pd.DataFrame:
 
 
 
+def _key_ext(key: str) -> str:
+    # "a/b/S1_R1.fastq.gz" -> "fastq.gz", "a/quant.sf" -> "sf", "a/README" -> "(none)"
+    parts = key.rsplit("/", 1)[-1].lower().split(".")
+    if len(parts) < 2 or not parts[-1]:
+        return "(none)"
+    if parts[-1] in ("gz", "bz2", "xz", "zst") and len(parts) > 2:
+        return f"{parts[-2]}.{parts[-1]}"
+    return parts[-1]
+
+
+def _glob_regex(glob: str) -> str:
+    # like fnmatch.translate, but * and ? stop at "/" and the match starts at a
+    # path segment: "S1*" is a file name starting with S1, "*/logs/*.log" the tail of a key
+    out, i = [], 0
+    while i < len(glob):
+        c = glob[i]
+        j = glob.find("]", i + 2) if c == "[" else -1  # a "]" right after "[" is literal
+        if c == "*":
+            out.append("[^/]*")
+        elif c == "?":
+            out.append("[^/]")
+        elif j > 0:
+            body = glob[i + 1:j].replace("\\", "\\\\")
+            out.append("[" + ("^" + body[1:] if body.startswith("!") else body) + "]")
+            i = j
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return r"(?:^|/)" + "".join(out) + r"\Z"
+
+
+def _compile_key_filter(needle: str):
+    """
+    Parses the Filter box:
+      re:<pattern>      regex search anywhere in the key (case-insensitive)
+      *.sf, S1_R?.fq*   glob on the file name (any of * ? [); with a "/" in it,
+                        on the last path segments, e.g. Salmon_Quant/*/quant.sf
+      anything else     plain substring (case-insensitive)
+
+    Returns ("contains", lowercase needle) or ("regex", compiled pattern).
+    Raises re.error for a bad regex.
+    """
+    needle = (needle or "").strip()
+    if needle.startswith("re:"):
+        return "regex", re.compile(needle[3:], re.IGNORECASE)
+    if any(c in needle for c in "*?["):
+        return "regex", re.compile(_glob_regex(needle), re.IGNORECASE)
+    return "contains", needle.lower()
+
+
 def _human_size(n: Optional[int]) -> str:
     if n is None:
         return ""
@@ -153,8 +293,7 @@ def _extract_fastqc_zip_from_s3_to_www(s3, bucket: str, zip_key: str) -> str:
     zip_bytes = obj["Body"].read()
 
     folder_name = _safe_dir_name_from_key(zip_key)
-    out_dir = (WWW_DOWNLOADS_DIR / folder_name)
-    out_dir.mkdir(parents=True, exist_ok=True)
+    out_dir = _ensure_dir(WWW_DOWNLOADS_DIR / folder_name)
 
     with zipfile.ZipFile(io.BytesIO(zip_bytes)) as z:
         for member in z.infolist():
@@ -192,7 +331,7 @@ def _rewrite_fastqc_html(s3, bucket: str, html_key: str, html: str) -> str:
     Handles <img>, <a>, <link>, <script>, and CSS url(...) inside <style>.
     """
     base = html_key.rsplit("/", 1)[0] + "/"
-    soup = BeautifulSoup(html, "html.parser")
+    soup = bs4.BeautifulSoup(html, "html.parser")
 
     def _maybe_presign(val: str) -> str:
         if not val:
@@ -235,45 +374,990 @@ def _rewrite_fastqc_html(s3, bucket: str, html_key: str, html: str) -> str:
 
 
 def _list_projects(s3, bucket: str) -> List[str]:
+    if LISTING_BACKEND == "inventory" and not INVENTORY_RECONCILE:
+        return _inventory_store(s3, bucket).projects()
+    # one delimiter call is cheap, so it stays live even with the inventory backend
     r = s3.list_objects_v2(Bucket=bucket, Prefix=BASE_PREFIX, Delimiter="/")
     return sorted(p["Prefix"].split("/")[-2] for p in r.get("CommonPrefixes", []))
 
 
-def _list_objects(s3, bucket: str, prefix: str, limit: int = MAX_LIST_OBJECTS) -> pd.DataFrame:
-    rows: List[Dict[str, Any]] = []
+def _project_cache_path(bucket: str) -> pathlib.Path:
+    h = hashlib.sha1(f"{bucket}|{BASE_PREFIX}".encode("utf-8")).hexdigest()[:12]
+    return CACHE_DIR / f"projects_{h}.json"
+
+
+def _read_project_cache(bucket: str) -> Optional[List[str]]:
+    """
+    Last persisted project listing for this bucket, or None.
+    Used to fill the Project dropdown instantly while a fresh listing runs.
+    """
+    path = _project_cache_path(bucket)
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    plist = data.get("projects") if isinstance(data, dict) else None
+    return [str(p) for p in plist] if isinstance(plist, list) else None
+
+
+def _write_project_cache(bucket: str, plist: List[str]) -> None:
+    path = _project_cache_path(bucket)
+    try:
+        _ensure_dir(path.parent)
+        tmp = path.with_name(f"{path.stem}.{os.getpid()}.tmp")
+        tmp.write_text(
+            json.dumps({"bucket": bucket, "prefix": BASE_PREFIX, "saved_at": time.time(), "projects": plist}),
+            encoding="utf-8",
+        )
+        os.replace(tmp, path)
+    except OSError as e:
+        print("[WARN] could not persist project cache:", repr(e))
+
+
+def _iter_pages(s3, bucket: str, prefix: str, **extra):
+    """
+    Yields raw list_objects_v2 responses under prefix, following continuation tokens.
+    """
     token: Optional[str] = None
 
     while True:
-        args: Dict[str, Any] = dict(Bucket=bucket, Prefix=prefix, MaxKeys=1000)
+        args: Dict[str, Any] = dict(Bucket=bucket, Prefix=prefix, MaxKeys=1000, **extra)
         if token:
             args["ContinuationToken"] = token
 
         r = s3.list_objects_v2(**args)
-
-        for o in r.get("Contents", []) or []:
-            rows.append(
-                {
-                    "key": o.get("Key", ""),
-                    "size": _human_size(o.get("Size")),
-                    "last_modified": _dt(o.get("LastModified")),
-                    "storage_class": o.get("StorageClass", ""),
-                }
-            )
-            if limit and len(rows) >= limit:
-                token = None
-                r["IsTruncated"] = False
-                break
+        yield r
 
         if not r.get("IsTruncated"):
             break
         token = r.get("NextContinuationToken")
 
+
+def _iter_objects(s3, bucket: str, prefix: str):
+    """
+    Yields raw list_objects_v2 "Contents" entries under prefix, page by page.
+    """
+    for r in _iter_pages(s3, bucket, prefix):
+        yield from r.get("Contents", []) or []
+
+
+def _list_objects(s3, bucket: str, prefix: str, limit: int = MAX_LIST_OBJECTS) -> pd.DataFrame:
+    rows: List[Dict[str, Any]] = []
+
+    if LISTING_BACKEND == "inventory":
+        objects = _inventory_objects(s3, bucket, prefix)
+    else:
+        objects = _iter_objects(s3, bucket, prefix)
+
+    for o in objects:
+        rows.append(
+            {
+                "key": o.get("Key", ""),
+                "size": _human_size(o.get("Size")),
+                "last_modified": _dt(o.get("LastModified")),
+                "storage_class": o.get("StorageClass", ""),
+            }
+        )
+        if limit and len(rows) >= limit:
+            break
+
     df = pd.DataFrame(rows)
     if not df.empty:
         df = df.sort_values(["last_modified", "key"], ascending=[False, True]).reset_index(drop=True)
     return df
 
 
+# ----------------- S3 Inventory listing backend -----------------
+# RNASEQ_LISTING_BACKEND=inventory reads the newest S3 Inventory report instead of
+# paginating list_objects_v2 over whole prefixes.
+#
+# RNASEQ_INVENTORY_URI points at one inventory configuration, either in S3 or as a
+# local mirror (e.g. `aws s3 sync s3://<dest>/<prefix>/<bucket>/<config-id>/ ./inv/`):
+#   s3://inventory-bucket/prefix/rnaseqdatabase/daily-all/
+#   /srv/inventory/rnaseqdatabase/daily-all/
+# The newest <timestamp>/manifest.json below it is used (CSV, ORC or Parquet).
+INVENTORY_URI = os.environ.get("RNASEQ_INVENTORY_URI", "").strip()
+INVENTORY_CHECK_SEC = int(os.environ.get("RNASEQ_INVENTORY_CHECK_SEC", "3600"))
+INVENTORY_RECONCILE = os.environ.get("RNASEQ_INVENTORY_RECONCILE", "1") not in ("", "0", "false")
+
+_INVENTORY_TS_RE = re.compile(r"^\d{4}-\d{2}-\d{2}T\d{2}-\d{2}Z$")
+
+
+def _snake(name: str) -> str:
+    # CSV fileSchema uses "LastModifiedDate", ORC/Parquet use "last_modified_date"
+    return re.sub(r"(?<=[a-z0-9])(?=[A-Z])", "_", name.strip()).lower()
+
+
+class _InventoryStore:
+    """
+    Columnar snapshot of one S3 Inventory report, restricted to BASE_PREFIX.
+
+    Keys are kept sorted, so a prefix is a searchsorted() range rather than a scan.
+    """
+
+    def __init__(self, frame: pd.DataFrame, created: datetime, manifest: str, source_bucket: str):
+        frame = frame.sort_values("key").reset_index(drop=True)
+        self.keys = frame["key"].to_numpy(dtype=object)
+        self.size = frame["size"].to_numpy()
+        # tz-aware Timestamps (datetime subclasses), so _dt() and comparisons just work
+        self.last_modified = frame["last_modified"].to_numpy(dtype=object)
+        self.storage_class = frame["storage_class"].to_numpy(dtype=object)
+        self.created = created
+        self.manifest = manifest
+        self.source_bucket = source_bucket
+
+    def _range(self, prefix: str):
+        lo = int(np.searchsorted(self.keys, prefix, side="left"))
+        hi = int(np.searchsorted(self.keys, prefix + "\uffff", side="left"))
+        return lo, hi
+
+    def objects(self, prefix: str) -> List[Dict[str, Any]]:
+        lo, hi = self._range(prefix)
+        return [
+            {
+                "Key": self.keys[i],
+                "Size": int(self.size[i]),
+                "LastModified": self.last_modified[i] if pd.notna(self.last_modified[i]) else None,
+                "StorageClass": self.storage_class[i],
+            }
+            for i in range(lo, hi)
+        ]
+
+    def projects(self) -> List[str]:
+        lo, hi = self._range(BASE_PREFIX)
+        out = set()
+        for k in self.keys[lo:hi]:
+            rest = k[len(BASE_PREFIX):]
+            if "/" in rest:
+                out.add(rest.split("/", 1)[0])
+        return sorted(out)
+
+
+def _inventory_locate_manifest(s3) -> tuple:
+    """
+    Newest manifest under INVENTORY_URI -> (kind, location, version)
+    kind is "s3" (location = (bucket, key)) or "local" (location = Path).
+    """
+    if not INVENTORY_URI:
+        raise RuntimeError("RNASEQ_LISTING_BACKEND=inventory needs RNASEQ_INVENTORY_URI.")
+
+    if INVENTORY_URI.startswith("s3://"):
+        bucket, _, prefix = INVENTORY_URI[5:].partition("/")
+        prefix = _normalize_prefix(prefix)
+        stamps = [
+            cp["Prefix"][len(prefix):].rstrip("/")
+            for r in _iter_pages(s3, bucket, prefix, Delimiter="/")
+            for cp in r.get("CommonPrefixes", []) or []
+        ]
+        stamps = sorted(t for t in stamps if _INVENTORY_TS_RE.match(t))
+        if not stamps:
+            raise RuntimeError(f"No inventory manifests under {INVENTORY_URI}")
+        return "s3", (bucket, f"{prefix}{stamps[-1]}/manifest.json"), stamps[-1]
+
+    root = pathlib.Path(INVENTORY_URI).expanduser()
+    if (root / "manifest.json").is_file():
+        return "local", root / "manifest.json", root.name
+    stamps = sorted(p.parent.name for p in root.glob("*/manifest.json") if _INVENTORY_TS_RE.match(p.parent.name))
+    if not stamps:
+        raise RuntimeError(f"No inventory manifests under {root}")
+    return "local", root / stamps[-1] / "manifest.json", stamps[-1]
+
+
+def _inventory_read_file(s3, kind: str, manifest_loc, data_key: str) -> bytes:
+    if kind == "s3":
+        bucket = manifest_loc[0]
+        return s3.get_object(Bucket=bucket, Key=data_key)["Body"].read()
+
+    # local mirror: data files sit in <config>/data/ next to the <timestamp>/ folders
+    manifest_path: pathlib.Path = manifest_loc
+    name = pathlib.PurePosixPath(data_key).name
+    for cand in (manifest_path.parent.parent / "data" / name, manifest_path.parent / "data" / name, manifest_path.parent / name):
+        if cand.is_file():
+            return cand.read_bytes()
+    raise RuntimeError(f"Inventory data file not found locally: {data_key}")
+
+
+def _inventory_parse(fmt: str, schema: str, raw: bytes) -> pd.DataFrame:
+    if fmt == "CSV":
+        names = [_snake(c) for c in schema.split(",")]
+        if raw[:2] == b"\x1f\x8b":
+            raw = gzip.decompress(raw)
+        frame = pd.read_csv(io.BytesIO(raw), header=None, names=names, dtype=str, keep_default_na=False)
+        # CSV inventories URL-encode keys
+        frame["key"] = frame["key"].map(urllib.parse.unquote_plus)
+    elif fmt in ("PARQUET", "ORC"):
+        try:
+            frame = pd.read_parquet(io.BytesIO(raw)) if fmt == "PARQUET" else pd.read_orc(io.BytesIO(raw))
+        except ImportError as e:
+            raise RuntimeError(f"Reading {fmt} inventories needs pyarrow: {e}") from e
+        frame.columns = [_snake(c) for c in frame.columns]
+    else:
+        raise RuntimeError(f"Unsupported inventory fileFormat: {fmt}")
+
+    for col in ("is_latest", "is_delete_marker"):
+        if col in frame.columns:
+            frame[col] = frame[col].astype(str).str.lower().isin(("true", "1"))
+    if "is_latest" in frame.columns:
+        frame = frame[frame["is_latest"]]
+    if "is_delete_marker" in frame.columns:
+        frame = frame[~frame["is_delete_marker"]]
+
+    frame = frame[frame["key"].astype(str).str.startswith(BASE_PREFIX)]
+    out = pd.DataFrame({"key": frame["key"].astype(str)})
+    out["size"] = pd.to_numeric(frame["size"], errors="coerce").fillna(0).astype("int64") if "size" in frame else 0
+    out["last_modified"] = (
+        pd.to_datetime(frame["last_modified_date"], utc=True, errors="coerce") if "last_modified_date" in frame else pd.NaT
+    )
+    out["storage_class"] = frame["storage_class"].astype(str) if "storage_class" in frame else ""
+    return out
+
+
+def _inventory_load(s3, kind: str, manifest_loc, version: str) -> _InventoryStore:
+    if kind == "s3":
+        bucket, key = manifest_loc
+        manifest = json.loads(s3.get_object(Bucket=bucket, Key=key)["Body"].read())
+        where = f"s3://{bucket}/{key}"
+    else:
+        manifest = json.loads(pathlib.Path(manifest_loc).read_text(encoding="utf-8"))
+        where = str(manifest_loc)
+
+    # parsed snapshots are cached, so a restart does not re-read the report;
+    # named inventory_<config>_<report>.pkl so configs can share CACHE_DIR
+    cfg = hashlib.sha1(f"{INVENTORY_URI}|{BASE_PREFIX}".encode("utf-8")).hexdigest()[:8]
+    h = hashlib.sha1(f"{where}|{manifest.get('creationTimestamp')}|{BASE_PREFIX}".encode("utf-8")).hexdigest()[:12]
+    cache_path = CACHE_DIR / f"inventory_{cfg}_{h}.pkl"
+    created_ms = int(manifest.get("creationTimestamp") or 0)
+    created = datetime.fromtimestamp(created_ms / 1000, tz=timezone.utc)
+
+    if cache_path.is_file():
+        frame = pd.read_pickle(cache_path)
+    else:
+        t0 = time.perf_counter()
+        fmt = str(manifest.get("fileFormat", "CSV")).upper()
+        schema = manifest.get("fileSchema", "")
+        frames = [
+            _inventory_parse(fmt, schema, _inventory_read_file(s3, kind, manifest_loc, f["key"]))
+            for f in manifest.get("files", [])
+        ]
+        frame = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(
+            columns=["key", "size", "last_modified", "storage_class"]
+        )
+        _ensure_dir(CACHE_DIR)
+        # other workers may read_pickle() as soon as the name exists
+        tmp = cache_path.with_name(f"{cache_path.stem}.{os.getpid()}.tmp")
+        frame.to_pickle(tmp)
+        os.replace(tmp, cache_path)
+        print(f"[INVENTORY] {where}: {len(frame)} keys from {len(frames)} {fmt} files in {time.perf_counter() - t0:.1f}s")
+
+    # one snapshot per config: drop the ones for its older reports
+    for old in CACHE_DIR.glob(f"inventory_{cfg}_*.pkl"):
+        if old != cache_path:
+            try:
+                old.unlink()
+            except OSError:
+                pass
+
+    return _InventoryStore(frame, created, where, str(manifest.get("sourceBucket", "")))
+
+
+_INVENTORY: Dict[str, Any] = {"store": None, "version": None, "checked": 0.0}
+_INVENTORY_LOCK = threading.Lock()
+
+
+def _inventory_store(s3, bucket: str) -> _InventoryStore:
+    """
+    Newest inventory snapshot; checks for a newer report every INVENTORY_CHECK_SEC.
+    """
+    with _INVENTORY_LOCK:
+        if _INVENTORY["store"] is None or time.time() - _INVENTORY["checked"] >= INVENTORY_CHECK_SEC:
+            kind, loc, version = _inventory_locate_manifest(s3)
+            if version != _INVENTORY["version"]:
+                _INVENTORY["store"] = _inventory_load(s3, kind, loc, version)
+                _INVENTORY["version"] = version
+            _INVENTORY["checked"] = time.time()
+        store = _INVENTORY["store"]
+
+    if store.source_bucket and store.source_bucket != bucket:
+        raise RuntimeError(f"Inventory at {INVENTORY_URI} is for bucket '{store.source_bucket}', not '{bucket}'.")
+    return store
+
+
+def _inventory_reconcile_level(s3, bucket: str, store: _InventoryStore, by_key: Dict[str, Any], level: str) -> None:
+    """
+    One delimiter LIST of `level`, applied to by_key in place:
+      - direct children newer than the inventory (or missing from it) are added,
+        direct children that are gone are dropped;
+      - sub-folders the inventory does not know (e.g. a new sample dir) are listed
+        live in full, sub-folders that are gone are dropped;
+      - a "<name>.done" marker newer than the inventory re-lists "<name>/" in full,
+        so a sample that finished after the report shows its final files.
+    """
+    known_dirs = set()
+    for k in by_key:
+        if k.startswith(level):
+            rest = k[len(level):]
+            if "/" in rest:
+                known_dirs.add(level + rest.split("/", 1)[0] + "/")
+
+    live_direct: Dict[str, Dict[str, Any]] = {}
+    live_dirs = set()
+    for r in _iter_pages(s3, bucket, level, Delimiter="/"):
+        for o in r.get("Contents", []) or []:
+            live_direct[o["Key"]] = o
+        live_dirs.update(cp["Prefix"] for cp in r.get("CommonPrefixes", []) or [])
+
+    for k in [k for k in by_key if k.startswith(level) and "/" not in k[len(level):] and k not in live_direct]:
+        del by_key[k]
+
+    relist = live_dirs - known_dirs
+    for k, o in live_direct.items():
+        lm = o.get("LastModified")
+        if k not in by_key or (lm and lm > store.created):
+            by_key[k] = o
+            if k.endswith(".done") and f"{k[:-5]}/" in live_dirs:
+                relist.add(f"{k[:-5]}/")
+
+    for gone in known_dirs - live_dirs:
+        for k in [k for k in by_key if k.startswith(gone)]:
+            del by_key[k]
+    for d in sorted(relist):
+        for k in [k for k in by_key if k.startswith(d)]:
+            del by_key[k]
+        for o in _iter_objects(s3, bucket, d):
+            by_key[o["Key"]] = o
+
+
+def _inventory_objects(s3, bucket: str, prefix: str) -> List[Dict[str, Any]]:
+    """
+    Objects under prefix from the inventory, reconciled level by level with a
+    delimiter LIST of the prefix itself and of the sentinel prefixes below it
+    (the project's Salmon_Quant/, see _sentinel_prefixes), so new samples and
+    fresh .done markers show up before the next report. Other changes deeper
+    inside already-known sub-folders show up with the next report.
+    """
+    store = _inventory_store(s3, bucket)
+    by_key = {o["Key"]: o for o in store.objects(prefix)}
+    if not INVENTORY_RECONCILE:
+        return list(by_key.values())
+
+    for level in _sentinel_prefixes(prefix):
+        if level.startswith(prefix):
+            _inventory_reconcile_level(s3, bucket, store, by_key, level)
+
+    return list(by_key.values())
+
+
+# ----------------- bucket-wide key index -----------------
+KEY_INDEX_ENABLED = os.environ.get("RNASEQ_KEY_INDEX", "1") not in ("", "0", "false")
+KEY_INDEX_REFRESH_SEC = int(os.environ.get("RNASEQ_KEY_INDEX_REFRESH_SEC", "900"))
+SEARCH_RESULT_LIMIT = 200
+
+
+def _subfolder_for_rel(rel: str) -> str:
+    # "<project>/<subfolder>/..." -> matching SUBFOLDER_CHOICES entry
+    parts = rel.split("/")
+    sf = parts[1] + "/" if len(parts) > 2 else ""
+    return sf if sf in SUBFOLDER_CHOICES else "(project root)"
+
+
+class _KeyIndex:
+    """
+    Persistent SQLite index of every key under BASE_PREFIX in one bucket.
+
+    A daemon thread lists the bucket (or, with the inventory backend, reads the
+    S3 Inventory report) project by project and reconciles each project against
+    the index, so only new/changed/deleted keys are written.
+    Projects passed to request_project() jump the queue (the app calls it
+    whenever a project is listed), the rest are re-checked every
+    KEY_INDEX_REFRESH_SEC.
+
+    Substring search uses an FTS5 trigram table; "^text" searches use the
+    NOCASE b-tree on the relative key. Both are case-insensitive.
+    """
+
+    def __init__(self, region: str, bucket: str):
+        self.region = region
+        self.bucket = bucket
+        # keyed like _KEY_INDEXES, so one thread writes each file
+        h = hashlib.sha1(f"{region}|{bucket}|{BASE_PREFIX}".encode("utf-8")).hexdigest()[:12]
+        self.path = CACHE_DIR / f"keys_{h}.sqlite"
+        self.status = "Index not built yet."
+        self.has_fts = False
+        self.ready = False  # True after the first full pass
+
+        self._queue: List[str] = []
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._init_db()
+
+    @contextmanager
+    def _db(self):
+        # one short-lived connection per call; WAL lets searches read while the thread writes
+        conn = sqlite3.connect(str(self.path), timeout=30)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _init_db(self) -> None:
+        _ensure_dir(self.path.parent)
+        with self._db() as conn:
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS objects (
+                    key TEXT PRIMARY KEY,
+                    rel TEXT COLLATE NOCASE,
+                    project TEXT,
+                    size INTEGER,
+                    last_modified TEXT,
+                    etag TEXT
+                );
+                CREATE INDEX IF NOT EXISTS objects_rel ON objects(rel);
+                CREATE INDEX IF NOT EXISTS objects_project ON objects(project);
+                CREATE TABLE IF NOT EXISTS projects (
+                    project TEXT PRIMARY KEY,
+                    indexed_at REAL,
+                    n_keys INTEGER
+                );
+                """
+            )
+            try:
+                conn.executescript(
+                    """
+                    CREATE VIRTUAL TABLE IF NOT EXISTS objects_fts USING fts5(
+                        rel, content='objects', content_rowid='rowid', tokenize='trigram'
+                    );
+                    CREATE TRIGGER IF NOT EXISTS objects_ai AFTER INSERT ON objects BEGIN
+                        INSERT INTO objects_fts(rowid, rel) VALUES (new.rowid, new.rel);
+                    END;
+                    CREATE TRIGGER IF NOT EXISTS objects_ad AFTER DELETE ON objects BEGIN
+                        INSERT INTO objects_fts(objects_fts, rowid, rel) VALUES ('delete', old.rowid, old.rel);
+                    END;
+                    """
+                )
+                self.has_fts = True
+            except sqlite3.OperationalError as e:
+                # SQLite < 3.34 has no trigram tokenizer: substring search scans instead
+                print("[INDEX] FTS5 trigram unavailable, using LIKE scans:", repr(e))
+
+    # ---------- background refresh ----------
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name=f"key-index-{self.bucket}", daemon=True)
+            self._thread.start()
+
+    def request_project(self, project: str) -> None:
+        if project and project not in self._queue:
+            self._queue.insert(0, project)
+        self._wake.set()
+
+    def _run(self) -> None:
+        next_full = 0.0
+        s3 = None
+        while True:
+            try:
+                if s3 is None:
+                    s3 = _make_s3(self.region)
+                if time.time() >= next_full:
+                    self._full_pass(s3)
+                    next_full = time.time() + KEY_INDEX_REFRESH_SEC
+                while self._queue:
+                    self._index_project(s3, self._queue.pop(0))
+            except Exception as e:
+                print("[ERROR] key index:", repr(e))
+                traceback.print_exc()
+                self.status = f"Index refresh failed: {e}"
+                next_full = time.time() + 60
+
+            self._wake.wait(timeout=max(1.0, next_full - time.time()))
+            self._wake.clear()
+
+    def _full_pass(self, s3) -> None:
+        t0 = time.perf_counter()
+        plist = _list_projects(s3, self.bucket)
+        with self._db() as conn:
+            indexed = dict(conn.execute("SELECT project, indexed_at FROM projects").fetchall())
+            for gone in set(indexed) - set(plist):
+                conn.execute("DELETE FROM objects WHERE project = ?", (gone,))
+                conn.execute("DELETE FROM projects WHERE project = ?", (gone,))
+
+        # least recently indexed first, so an interrupted pass still makes progress
+        for i, proj in enumerate(sorted(plist, key=lambda p: indexed.get(p, 0.0))):
+            self.status = f"Indexing {proj} ({i + 1}/{len(plist)})…"
+            self._index_project(s3, proj)
+            while self._queue:
+                self._index_project(s3, self._queue.pop(0))
+
+        self.ready = True
+        print(f"[INDEX] {self.bucket}: {len(plist)} projects in {time.perf_counter() - t0:.1f}s")
+
+    def _index_project(self, s3, project: str) -> None:
+        prefix = f"{BASE_PREFIX}{project}/"
+        if LISTING_BACKEND == "inventory":
+            # the report plus a few delimiter LISTs, not a full LIST of the project
+            objects = _inventory_objects(s3, self.bucket, prefix)
+        else:
+            objects = _iter_objects(s3, self.bucket, prefix)
+        rows = [
+            (
+                o.get("Key", ""),
+                o.get("Key", "")[len(BASE_PREFIX):],
+                project,
+                o.get("Size"),
+                _dt(o.get("LastModified")),
+                o.get("ETag", ""),
+            )
+            for o in objects
+        ]
+
+        with self._db() as conn:
+            conn.execute("CREATE TEMP TABLE IF NOT EXISTS seen (key TEXT PRIMARY KEY)")
+            conn.execute("DELETE FROM seen")
+            conn.executemany("INSERT OR IGNORE INTO seen VALUES (?)", [(r[0],) for r in rows])
+            conn.execute(
+                "DELETE FROM objects WHERE project = ? AND key NOT IN (SELECT key FROM seen)",
+                (project,),
+            )
+            conn.executemany(
+                """
+                INSERT INTO objects (key, rel, project, size, last_modified, etag)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET
+                    size = excluded.size,
+                    last_modified = excluded.last_modified,
+                    etag = excluded.etag
+                WHERE objects.etag IS NOT excluded.etag OR objects.size IS NOT excluded.size
+                """,
+                rows,
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO projects (project, indexed_at, n_keys) VALUES (?, ?, ?)",
+                (project, time.time(), len(rows)),
+            )
+            n_keys, n_proj = conn.execute(
+                "SELECT (SELECT COUNT(*) FROM objects), (SELECT COUNT(*) FROM projects)"
+            ).fetchone()
+
+        self.status = f"Index: {n_keys} keys in {n_proj} projects (updated {_dt(datetime.now(timezone.utc))})."
+
+    # ---------- search ----------
+    def search(self, needle: str, limit: int = SEARCH_RESULT_LIMIT) -> pd.DataFrame:
+        needle = (needle or "").strip()
+        cols = ["project", "subfolder", "key", "size", "last_modified"]
+        if not needle:
+            return pd.DataFrame(columns=cols)
+
+        select = "SELECT o.key, o.rel, o.project, o.size, o.last_modified FROM objects o"
+        if needle.startswith("^"):
+            p = needle[1:]
+            sql = f"{select} WHERE o.rel >= ? AND o.rel < ? ORDER BY o.rel LIMIT ?"
+            args: tuple = (p, p + "\uffff", limit)
+        elif self.has_fts and len(needle) >= 3:
+            phrase = '"' + needle.replace('"', '""') + '"'
+            sql = (
+                f"{select} JOIN objects_fts f ON f.rowid = o.rowid "
+                "WHERE objects_fts MATCH ? LIMIT ?"
+            )
+            args = (phrase, limit)
+        else:
+            esc = needle.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            sql = f"{select} WHERE o.rel LIKE ? ESCAPE '\\' ORDER BY o.rel LIMIT ?"
+            args = (f"%{esc}%", limit)
+
+        with self._db() as conn:
+            rows = conn.execute(sql, args).fetchall()
+
+        return pd.DataFrame(
+            [
+                {
+                    "project": proj,
+                    "subfolder": _subfolder_for_rel(rel),
+                    "key": key,
+                    "size": _human_size(size),
+                    "last_modified": lm,
+                }
+                for key, rel, proj, size, lm in rows
+            ],
+            columns=cols,
+        )
+
+
+_KEY_INDEXES: Dict[tuple, _KeyIndex] = {}
+_KEY_INDEXES_LOCK = threading.Lock()
+
+
+def _key_index(region: str, bucket: str) -> _KeyIndex:
+    """
+    One shared index (and refresh thread) per bucket, across all sessions.
+    """
+    with _KEY_INDEXES_LOCK:
+        idx = _KEY_INDEXES.get((region, bucket))
+        if idx is None:
+            idx = _KEY_INDEXES[(region, bucket)] = _KeyIndex(region, bucket)
+        return idx
+
+
+# ----------------- change-aware refresh -----------------
+# Auto-refresh no longer re-lists on a timer. One _PrefixWatcher per listed prefix
+# (shared by every session watching it) probes cheap sentinels and bumps .version
+# when they change; sessions re-list only then.
+WATCH_MAX_INTERVAL_SEC = int(os.environ.get("RNASEQ_WATCH_MAX_SEC", "1800"))
+WATCH_POLL_SEC = 2.0  # how often a session checks its watcher's version (in memory, no S3 calls)
+
+# Optional local stand-in for an S3 event notification queue: a consumer (SQS
+# poller, Lambda, test) drops S3 event JSON files here ({"Records": [{"s3": ...}]}).
+# Writers must write to a temp name (not *.json) and rename it into place; a file
+# read half-written is reported as bad and its event is lost. The spool has a
+# single consumer: files are deleted once read, so with several worker processes
+# only one sees each event and the others rely on WATCH_MAX_INTERVAL_SEC probes.
+# Run one worker (or fan events out to one spool dir per worker) when using it.
+S3_EVENTS_DIR = os.environ.get("RNASEQ_S3_EVENTS_DIR", "").strip()
+
+
+def _sentinel_prefixes(prefix: str) -> List[str]:
+    """
+    The listed prefix itself, plus the project's Salmon_Quant/ where the
+    <sample>.done markers land when a quantification finishes.
+    """
+    out = [prefix]
+    rest = prefix[len(BASE_PREFIX):] if prefix.startswith(BASE_PREFIX) else ""
+    if rest:
+        salmon = f"{BASE_PREFIX}{rest.split('/', 1)[0]}/Salmon_Quant/"
+        if salmon != prefix:
+            out.append(salmon)
+    return out
+
+
+def _probe_prefix(s3, bucket: str, prefix: str) -> str:
+    """
+    Cheap change signature for prefix: one delimiter LIST per sentinel prefix
+    (direct objects with ETag/LastModified, plus immediate sub-folders), following
+    every page so changes past the first 1000 entries are seen too.
+    """
+    h = hashlib.sha1()
+    for sp in _sentinel_prefixes(prefix):
+        for r in _iter_pages(s3, bucket, sp, Delimiter="/"):
+            for o in r.get("Contents", []) or []:
+                h.update(f"{o.get('Key')}|{o.get('ETag')}|{o.get('LastModified')}\n".encode("utf-8"))
+            for cp in r.get("CommonPrefixes", []) or []:
+                h.update(f"{cp.get('Prefix')}/\n".encode("utf-8"))
+    return h.hexdigest()
+
+
+class _PrefixWatcher:
+    """
+    Watches one (bucket, prefix) for all subscribed sessions.
+
+    Probes every `interval` seconds, starting at the smallest interval any
+    subscriber asked for and doubling after each unchanged probe, up to
+    WATCH_MAX_INTERVAL_SEC, so finished projects cost almost nothing. A change
+    resets the backoff. With RNASEQ_S3_EVENTS_DIR set, events mark changes and
+    probes only run at the max interval as a safety net.
+    """
+
+    def __init__(self, region: str, bucket: str, prefix: str):
+        self.region = region
+        self.bucket = bucket
+        self.prefix = prefix
+        self.version = 0
+        self.status = "Waiting for first probe…"
+        self.interval = 30.0
+
+        self._subs: Dict[Any, float] = {}
+        self._sig: Optional[str] = None
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def base_interval(self) -> float:
+        if S3_EVENTS_DIR:
+            return float(WATCH_MAX_INTERVAL_SEC)
+        return min(self._subs.values(), default=30.0)
+
+    def subscribe(self, token: Any, interval: float) -> None:
+        self._subs[token] = float(interval)
+        self.interval = min(self.interval, self.base_interval())
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name=f"watch-{self.prefix}", daemon=True)
+            self._thread.start()
+        self._wake.set()
+
+    def unsubscribe(self, token: Any) -> bool:
+        """True when the last subscriber left (the thread then exits)."""
+        self._subs.pop(token, None)
+        self._wake.set()
+        return not self._subs
+
+    def mark_changed(self, reason: str) -> None:
+        self.version += 1
+        self.interval = self.base_interval()
+        self.status = f"Change detected ({reason}) at {_dt(datetime.now(timezone.utc))}."
+        print(f"[WATCH] {self.bucket}/{self.prefix}: {reason}")
+
+    def _run(self) -> None:
+        s3 = None
+        while self._subs:
+            try:
+                if s3 is None:
+                    s3 = _make_s3(self.region)
+                sig = _probe_prefix(s3, self.bucket, self.prefix)
+                if self._sig is None:
+                    self.interval = self.base_interval()
+                    self.status = f"Watching; next check in {int(self.interval)}s."
+                elif sig != self._sig:
+                    self.mark_changed("sentinel probe")
+                else:
+                    self.interval = min(self.interval * 2, WATCH_MAX_INTERVAL_SEC)
+                    self.status = f"No change; next check in {int(self.interval)}s."
+                self._sig = sig
+            except Exception as e:
+                print("[ERROR] watcher probe:", repr(e))
+                self.status = f"Change probe failed: {e}"
+
+            t0 = time.monotonic()
+            while self._subs and time.monotonic() - t0 < self.interval:
+                if self._wake.wait(timeout=self.interval - (time.monotonic() - t0)):
+                    self._wake.clear()
+                    # subscribe/unsubscribe wakes us: re-check, don't probe early
+                    continue
+
+
+_WATCHERS: Dict[tuple, _PrefixWatcher] = {}
+_WATCHERS_LOCK = threading.Lock()
+
+
+def _watch_prefix(region: str, bucket: str, prefix: str, token: Any, interval: float) -> _PrefixWatcher:
+    with _WATCHERS_LOCK:
+        w = _WATCHERS.get((region, bucket, prefix))
+        if w is None:
+            w = _WATCHERS[(region, bucket, prefix)] = _PrefixWatcher(region, bucket, prefix)
+        w.subscribe(token, interval)
+    _start_event_spool()
+    return w
+
+
+def _unwatch_prefix(w: _PrefixWatcher, token: Any) -> None:
+    with _WATCHERS_LOCK:
+        if w.unsubscribe(token):
+            _WATCHERS.pop((w.region, w.bucket, w.prefix), None)
+
+
+_EVENT_SPOOL: Dict[str, Any] = {"thread": None}
+
+
+def _start_event_spool() -> None:
+    if not S3_EVENTS_DIR or _EVENT_SPOOL["thread"] is not None:
+        return
+    _EVENT_SPOOL["thread"] = threading.Thread(target=_consume_event_spool, name="s3-event-spool", daemon=True)
+    _EVENT_SPOOL["thread"].start()
+
+
+def _consume_event_spool() -> None:
+    """
+    Single consumer for RNASEQ_S3_EVENTS_DIR: routes each S3 event record to
+    the watchers whose prefix contains the key, then deletes the file. Only
+    *.json files are read, so writers rename complete files into place.
+    """
+    spool = _ensure_dir(pathlib.Path(S3_EVENTS_DIR))
+    while True:
+        for path in sorted(spool.glob("*.json")):
+            try:
+                records = json.loads(path.read_text(encoding="utf-8")).get("Records", [])
+            except (OSError, ValueError) as e:
+                print("[WARN] bad S3 event file:", path.name, repr(e))
+                records = []
+
+            for rec in records:
+                s3i = rec.get("s3", {})
+                bucket = s3i.get("bucket", {}).get("name", "")
+                key = urllib.parse.unquote_plus(s3i.get("object", {}).get("key", ""))
+                with _WATCHERS_LOCK:
+                    hits = [w for w in _WATCHERS.values() if w.bucket == bucket and key.startswith(w.prefix)]
+                for w in hits:
+                    w.mark_changed(f"{rec.get('eventName', 'event')} {key}")
+
+            try:
+                path.unlink()
+            except OSError:
+                pass
+        time.sleep(1.0)
+
+
+# ----------------- sample prefetch -----------------
+# Picking a sample is nearly always followed by open_log / open_meta /
+# download_quant / view_fastqc. Each session's _SamplePrefetcher warms those in a
+# background thread (presigned URLs first, then the log/meta heads, then the
+# FastQC render) so the click is answered from memory. Picking another sample
+# cancels whatever is still pending for the previous one.
+PREFETCH_ENABLED = os.environ.get("RNASEQ_PREFETCH", "1") not in ("", "0", "false")
+PREFETCH_HEAD_BYTES = int(os.environ.get("RNASEQ_PREFETCH_HEAD_BYTES", "65536"))
+PREFETCH_MAX_ENTRIES = 64
+PRESIGN_EXPIRES_SEC = 3600
+# warmed URLs (and reports, whose images are presigned) are reused only while
+# they have at least this long left; heads are re-read after HEAD_TTL
+PRESIGN_MIN_TTL_SEC = 600
+PREFETCH_HEAD_TTL_SEC = 300
+
+
+def _read_head(s3, bucket: str, key: str, n: int = PREFETCH_HEAD_BYTES) -> str:
+    obj = s3.get_object(Bucket=bucket, Key=key, Range=f"bytes=0-{n - 1}")
+    return obj["Body"].read().decode("utf-8", errors="replace")
+
+
+def _render_report(s3, bucket: str, key: str) -> str:
+    """
+    Makes a FastQC/QC report viewable and returns its local URL: ZIPs are
+    extracted, HTML gets its Images/ + Icons/ references presigned.
+    """
+    k = key.lower().strip()
+    if _is_report_zip(k):
+        return _extract_fastqc_zip_from_s3_to_www(s3, bucket, key)
+
+    obj = s3.get_object(Bucket=bucket, Key=key)
+    html = obj["Body"].read().decode("utf-8", errors="ignore")
+    rewritten = _rewrite_fastqc_html(s3, bucket, key, html)
+
+    local_name = _local_html_name_for_key(key)
+    out_path = _ensure_dir(WWW_DOWNLOADS_DIR) / local_name
+    # workers and sessions may render the same report at once
+    tmp = out_path.with_name(f".{local_name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.write_text(rewritten, encoding="utf-8")
+    os.replace(tmp, out_path)
+    return f"{FASTQC_PREVIEW_BASE_URL}/{local_name}"
+
+
+_PREFETCH_LOADERS = {
+    "url": lambda s3, bucket, key: _presign(s3, bucket, key, PRESIGN_EXPIRES_SEC),
+    "head": _read_head,
+    "report": _render_report,
+}
+_PREFETCH_TTL = {
+    "url": PRESIGN_EXPIRES_SEC - PRESIGN_MIN_TTL_SEC,
+    "head": PREFETCH_HEAD_TTL_SEC,
+    "report": PRESIGN_EXPIRES_SEC - PRESIGN_MIN_TTL_SEC,
+}
+
+
+class _SamplePrefetcher:
+    """
+    Per-session speculative cache for the selected sample's artifacts.
+
+    warm() queues a batch of (kind, key) jobs for the session's single daemon
+    worker thread (started on first use, stopped by close()); get() serves from
+    the cache (a hit), waits for a job that is already running for that key, or
+    loads it itself (a miss). Entries are keyed by (kind, bucket, key) and kept
+    LRU, so flipping back to a recent sample still hits.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[tuple, tuple]" = OrderedDict()  # -> (loaded_at, value)
+        self._inflight: Dict[tuple, threading.Event] = {}
+        self._gen = 0
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self.stats = {"hits": 0, "misses": 0, "warmed": 0, "cancelled": 0}
+
+    def _fresh(self, ck: tuple):
+        with self._lock:
+            hit = self._cache.get(ck)
+            if hit is None or time.time() - hit[0] > _PREFETCH_TTL[ck[0]]:
+                return None
+            self._cache.move_to_end(ck)
+            return hit[1]
+
+    def _put(self, ck: tuple, value) -> None:
+        with self._lock:
+            self._cache[ck] = (time.time(), value)
+            self._cache.move_to_end(ck)
+            while len(self._cache) > PREFETCH_MAX_ENTRIES:
+                self._cache.popitem(last=False)
+
+    def warm(self, s3, bucket: str, label: str, jobs: List[tuple]) -> None:
+        with self._lock:
+            self._gen += 1
+            gen = self._gen
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._worker, name="sample-prefetch", daemon=True)
+                self._thread.start()
+        # batches queued before this one now carry a stale generation and are skipped
+        self._queue.put((gen, s3, bucket, label, jobs))
+
+    def cancel(self) -> None:
+        with self._lock:
+            self._gen += 1
+
+    def close(self) -> None:
+        self.cancel()
+        self._queue.put(None)
+
+    def _worker(self) -> None:
+        while True:
+            batch = self._queue.get()
+            if batch is None:
+                return
+            self._run(*batch)
+
+    def _run(self, gen: int, s3, bucket: str, label: str, jobs: List[tuple]) -> None:
+        t0 = time.perf_counter()
+        warmed = 0
+        for i, (kind, key) in enumerate(jobs):
+            if gen != self._gen:
+                with self._lock:
+                    self.stats["cancelled"] += len(jobs) - i
+                print(f"[PREFETCH] {label}: cancelled {len(jobs) - i} of {len(jobs)} (selection changed)")
+                return
+
+            ck = (kind, bucket, key)
+            with self._lock:
+                if ck in self._inflight:
+                    continue
+                done = self._inflight[ck] = threading.Event()
+            try:
+                if self._fresh(ck) is None:
+                    self._put(ck, _PREFETCH_LOADERS[kind](s3, bucket, key))
+                    warmed += 1
+            except Exception as e:
+                print(f"[PREFETCH] {label}: {kind} {key} failed: {e!r}")
+            finally:
+                with self._lock:
+                    self._inflight.pop(ck, None)
+                done.set()
+            # background work: let request handlers have the GIL between items
+            time.sleep(0.01)
+
+        with self._lock:
+            self.stats["warmed"] += warmed
+        print(f"[PREFETCH] {label}: warmed {warmed} of {len(jobs)} in {time.perf_counter() - t0:.2f}s")
+
+    def get(self, kind: str, s3, bucket: str, key: str):
+        ck = (kind, bucket, key)
+        value = self._fresh(ck)
+        if value is None:
+            with self._lock:
+                pending = self._inflight.get(ck)
+            if pending is not None:
+                # already being fetched in the background; cheaper to wait than to redo it
+                pending.wait(timeout=60)
+                value = self._fresh(ck)
+        hit = value is not None
+        if not hit:
+            value = _PREFETCH_LOADERS[kind](s3, bucket, key)
+            self._put(ck, value)
+
+        with self._lock:
+            self.stats["hits" if hit else "misses"] += 1
+        print(f"[PREFETCH] {'hit' if hit else 'miss'} {kind} {key.rsplit('/', 1)[-1]} ({self.report()})")
+        return value
+
+    def report(self) -> str:
+        st = self.stats
+        n = st["hits"] + st["misses"]
+        rate = f"{100.0 * st['hits'] / n:.0f}%" if n else "n/a"
+        return f"hit rate {rate}: {st['hits']}/{n} hits, {st['warmed']} warmed, {st['cancelled']} cancelled"
+
+
 # ----------------- UI -----------------
 
 app_ui = ui.page_fluid(
@@ -335,13 +1419,20 @@ app_ui = ui.page_fluid(
 
             ui.hr(),
 
-            ui.input_text("filter", "Filter (contains in key)", value=""),
+            ui.input_text("filter", "Filter (text in key; glob on file name, e.g. *.sf; or re:regex)", value=""),
+            ui.input_selectize("ext_filter", "File types", choices=[], multiple=True),
             ui.input_checkbox("auto_list", "Auto-list when Project/Subfolder changes", value=False),
 
             ui.hr(),
 
-            ui.input_checkbox("auto_refresh", "Auto-refresh list", value=False),
-            ui.input_numeric("auto_refresh_sec", "Refresh interval (sec)", value=30, min=5, step=5),
+            ui.input_text("search_all", "Search all projects (substring, or ^prefix)", value=""),
+            ui.input_numeric("search_idx", "Search result #", value=0, min=0, step=1),
+            ui.input_action_button("search_go", "Go to result", class_="btn-outline-primary"),
+
+            ui.hr(),
+
+            ui.input_checkbox("auto_refresh", "Auto-refresh list when S3 changes", value=False),
+            ui.input_numeric("auto_refresh_sec", "Change check interval (sec)", value=30, min=5, step=5),
 
             ui.hr(),
 
@@ -362,6 +1453,9 @@ app_ui = ui.page_fluid(
             ui.h4("Objects"),
             ui.output_ui("table"),
             ui.hr(),
+            ui.h4("Bucket search"),
+            ui.output_ui("search_results"),
+            ui.hr(),
             ui.h4("Preview"),
             ui.output_ui("preview_html"),
             ui.output_text_verbatim("preview_text"),
@@ -381,9 +1475,12 @@ def server(input, output, session):
     selected_sample = reactive.Value("")
 
     preview_state = reactive.Value("")
+    prefetch = _SamplePrefetcher()
     status_state = reactive.Value("Ready.")
     is_loading_objects = reactive.Value(False)
     selected_project_pref = reactive.Value("")
+    # bucket key index, set only once the bucket's project listing has succeeded
+    key_index = reactive.Value(None)
 
     def _get_project_value() -> str:
         try:
@@ -391,17 +1488,16 @@ def server(input, output, session):
         except Exception:
             return ""
 
-    def _subfolder_value() -> str:
-        sf = (input.subfolder() or "").strip()
-        return "" if sf == "(project root)" else sf
-
     def _find_key_for_sample(sample: str, kind: str) -> Optional[str]:
         """
-        kind: 'log' | 'meta' | 'quant'
+        kind: 'log' | 'meta' | 'quant' | 'fastqc'
         """
         if not sample:
             return None
 
+        if kind == "fastqc":
+            return _find_fastqc_for_sample(sample)
+
         full_df = df.get()
         if full_df.empty:
             return None
@@ -423,10 +1519,53 @@ def server(input, output, session):
             return None
         return str(hit.iloc[0]["key"])
 
+    def _find_fastqc_for_sample(sample: str) -> Optional[str]:
+        # "<sample>_R1_fastqc.html" / "<sample>_R1_001_fastqc.zip" under FastQC/ or QC/;
+        # the listed objects first, then the bucket key index (Samples mode lists Salmon_Quant/)
+        pat = re.compile(rf"/(FastQC|QC)/(.*/)?{re.escape(sample)}[_.][^/]*fastqc[^/]*\.(html?|zip)$", re.I)
+        # only Illumina sample/lane/read/chunk suffixes between the name and "_fastqc"
+        exact = re.compile(
+            rf"/{re.escape(sample)}(_S\d+)?(_L\d+)?(_R?[12])?(_\d+)?[_.]fastqc\.(html?|zip)$", re.I
+        )
+        # "WT" must not pick up "WT_2_R1_fastqc.html" when WT_2 is a sample too
+        sdf = samples_df()
+        longer = [] if sdf.empty else [
+            s for s in sdf["sample"].astype(str) if s != sample and s.startswith(sample)
+        ]
+
+        def _match(k: str) -> bool:
+            name = k.rsplit("/", 1)[-1]
+            return bool(pat.search(k)) and not any(re.match(rf"{re.escape(s)}[_.]", name) for s in longer)
+
+        full_df = df.get()
+        keys = [] if full_df.empty else full_df["key"].astype(str).tolist()
+        idx = key_index.get()
+        if idx is not None and not any(_match(k) for k in keys):
+            proj = _get_project_value()
+            keys = [
+                k for sf in ("FastQC", "QC")
+                for k in idx.search(f"^{proj}/{sf}/", limit=MAX_LIST_OBJECTS)["key"].tolist()
+            ]
+
+        hits = sorted(k for k in keys if _match(k))
+        # exact read/lane names first, then prefer the HTML report (no zip download/extract)
+        hits.sort(key=lambda k: (not exact.search(k), not k.lower().endswith((".html", ".htm"))))
+        return hits[0] if hits else None
+
     @reactive.Effect
     def _init_s3():
+        # Client is (re)built lazily: by the background project listing, or
+        # by _s3() if an action needs it first. Keeps boto3 off the first flush.
         _ = input.region()
-        s3.set(_make_s3(input.region()))
+        s3.set(None)
+
+    def _s3():
+        with reactive.isolate():
+            client = s3.get()
+            if client is None:
+                client = _make_s3(input.region())
+                s3.set(client)
+        return client
 
     # Open ANY selected file (works best in Raw files mode)
     @reactive.Effect
@@ -437,7 +1576,7 @@ def server(input, output, session):
             status_state.set("No file selected. Use 'Select row' first.")
             return
 
-        url = _presign(s3.get(), input.bucket(), key)
+        url = _presign(_s3(), input.bucket(), key)
         await session.send_custom_message("open_fastqc", {"url": url})
 
 
@@ -455,8 +1594,9 @@ def server(input, output, session):
             status_state.set(f"No salmon_quant.log found for sample '{sample}'.")
             return
 
-        url = _presign(s3.get(), input.bucket(), key)
+        url = prefetch.get("url", _s3(), input.bucket(), key)
         await session.send_custom_message("open_fastqc", {"url": url})
+        await _show_head(key)
 
 
     @reactive.Effect
@@ -468,8 +1608,9 @@ def server(input, output, session):
             status_state.set(f"No meta_info.json found for sample '{sample}'.")
             return
 
-        url = _presign(s3.get(), input.bucket(), key)
+        url = prefetch.get("url", _s3(), input.bucket(), key)
         await session.send_custom_message("open_fastqc", {"url": url})
+        await _show_head(key)
 
 
     @reactive.Effect
@@ -481,15 +1622,26 @@ def server(input, output, session):
             status_state.set(f"No quant.sf found for sample '{sample}'.")
             return
 
-        url = _presign(s3.get(), input.bucket(), key)
+        url = prefetch.get("url", _s3(), input.bucket(), key)
         await session.send_custom_message("open_fastqc", {"url": url})
 
+    async def _show_head(key: str) -> None:
+        # first PREFETCH_HEAD_BYTES of the file in the Preview pane (usually warmed already)
+        try:
+            head = await asyncio.to_thread(prefetch.get, "head", _s3(), input.bucket(), key)
+        except Exception as e:
+            status_state.set(f"Opened, but could not preview: {e}")
+            return
+        preview_state.set(head)
+
 
     # ---------------------------
     # Thread workers
     # ---------------------------
-    def _load_projects_work() -> List[str]:
-        return _list_projects(s3.get(), input.bucket())
+    def _load_projects_work(s3_client, region: str, bucket: str):
+        if s3_client is None or s3_client.meta.region_name != region:
+            s3_client = _make_s3(region)
+        return s3_client, bucket, _list_projects(s3_client, bucket)
 
     def _load_objects_work(proj: str, subfolder: str) -> pd.DataFrame:
         sf = "" if subfolder == "(project root)" else (subfolder or "")
@@ -507,34 +1659,74 @@ def server(input, output, session):
     # ---------------------------
     # Async loaders
     # ---------------------------
-    async def _load_projects_async():
-        try:
-            plist = await asyncio.to_thread(_load_projects_work)
-            projects.set(plist)
-
-            if plist:
-                pref = selected_project_pref.get()
-                if not pref or pref not in plist:
-                    selected_project_pref.set(plist[0])
+    def _apply_projects(plist: List[str]) -> None:
+        with reactive.isolate():
+            if plist != projects.get():
+                projects.set(plist)
+            pref = selected_project_pref.get()
+
+        if plist:
+            if not pref or pref not in plist:
+                selected_project_pref.set(plist[0])
+
+    # Fresh project listing runs as an ExtendedTask so the cached list (if
+    # any) reaches the browser without waiting on boto3 import + LIST.
+    @reactive.extended_task
+    async def _projects_task(s3_client, region: str, bucket: str):
+        return await asyncio.to_thread(_load_projects_work, s3_client, region, bucket)
+
+    def _start_projects_refresh() -> None:
+        with reactive.isolate():
+            _projects_task.invoke(s3.get(), input.region(), input.bucket())
 
-            status_state.set("Projects loaded.")
-        except botocore.exceptions.ClientError as e:
-            code = e.response.get("Error", {}).get("Code", "ClientError")
-            msg = e.response.get("Error", {}).get("Message", str(e))
-            projects.set([])
-            status_state.set(f"AWS error loading projects: {code} — {msg}")
-        except Exception as e:
-            print("[ERROR] load_projects_async:", repr(e))
-            traceback.print_exc()
-            projects.set([])
-            status_state.set(f"Failed to load projects: {e}")
-
-    async def _load_objects_async():
-        if s3.get() is None:
-            status_state.set("S3 client not ready yet. Try again in a second.")
+    @reactive.Effect
+    def _projects_task_done():
+        st = _projects_task.status()
+        if st not in ("success", "error"):
             return
 
-        proj = _get_project_value()
+        with reactive.isolate():
+            have_cached = bool(projects.get())
+            try:
+                s3_client, bucket, plist = _projects_task.result()
+            except botocore.exceptions.ClientError as e:
+                code = e.response.get("Error", {}).get("Code", "ClientError")
+                msg = e.response.get("Error", {}).get("Message", str(e))
+                if have_cached:
+                    status_state.set(f"AWS error loading projects: {code} — {msg} (showing cached list)")
+                else:
+                    status_state.set(f"AWS error loading projects: {code} — {msg}")
+                return
+            except Exception as e:
+                print("[ERROR] load_projects_async:", repr(e))
+                traceback.print_exc()
+                if have_cached:
+                    status_state.set(f"Failed to load projects: {e} (showing cached list)")
+                else:
+                    status_state.set(f"Failed to load projects: {e}")
+                return
+
+            if bucket != input.bucket() or s3_client.meta.region_name != input.region():
+                return  # bucket/region changed while listing; a newer task is running
+            if s3.get() is None:
+                s3.set(s3_client)
+
+        if KEY_INDEX_ENABLED:
+            # only for buckets that exist: typing in the Bucket box must not spawn indexes
+            idx = _key_index(s3_client.meta.region_name, bucket)
+            idx.start()
+            key_index.set(idx)
+
+        _apply_projects(plist)
+        _write_project_cache(bucket, plist)
+        status_state.set("Projects loaded.")
+
+    async def _load_objects_async(proj: Optional[str] = None, subfolder: Optional[str] = None):
+        _s3()
+
+        proj = proj or _get_project_value()
+        if subfolder is None:
+            subfolder = input.subfolder()
         if not proj:
             status_state.set("Select a project first.")
             df.set(pd.DataFrame())
@@ -546,12 +1738,15 @@ def server(input, output, session):
 
         is_loading_objects.set(True)
         try:
-            sf = _subfolder_value()
+            sf = "" if subfolder == "(project root)" else (subfolder or "").strip()
             prefix = _normalize_prefix(f"{BASE_PREFIX}{proj}/{sf}")
             status_state.set(f"Listing up to {MAX_LIST_OBJECTS} objects in: {prefix}")
 
-            new_df = await asyncio.to_thread(_load_objects_work, proj, input.subfolder())
+            new_df = await asyncio.to_thread(_load_objects_work, proj, subfolder)
             df.set(new_df)
+            idx = key_index.get()
+            if idx is not None:
+                idx.request_project(proj)
 
             if not new_df.empty:
                 selected_key.set(new_df.iloc[0]["key"])
@@ -625,15 +1820,26 @@ def server(input, output, session):
     # Startup + buttons
     # ---------------------------
     @reactive.Effect
-    async def _autoload_projects_on_start():
+    def _autoload_projects_on_start():
         _ = input.region()
-        _ = input.bucket()
-        await _load_projects_async()
+        bucket = input.bucket()
+        key_index.set(None)
+
+        cached = _read_project_cache(bucket)
+        if cached:
+            _apply_projects(cached)
+            status_state.set(f"{len(cached)} projects from cache; refreshing in background…")
+        else:
+            projects.set([])
+            status_state.set("Loading projects…")
+
+        _start_projects_refresh()
 
     @reactive.Effect
     @reactive.event(input.refresh)
-    async def _refresh_projects():
-        await _load_projects_async()
+    def _refresh_projects():
+        status_state.set("Refreshing projects…")
+        _start_projects_refresh()
 
     @reactive.Effect
     @reactive.event(input.list)
@@ -661,23 +1867,76 @@ def server(input, output, session):
 
         await _load_objects_async()
 
+    # Auto-refresh: subscribe to the shared watcher for the current prefix and
+    # re-list only when it reports a change.
+    watcher = reactive.Value(None)
+    _watch = {"token": object(), "seen": 0}
+
+    def _stop_watching() -> None:
+        with reactive.isolate():
+            w = watcher.get()
+        if w is not None:
+            _unwatch_prefix(w, _watch["token"])
+            watcher.set(None)
+
+    session.on_ended(lambda: _stop_watching())
+
+    def _end_prefetch() -> None:
+        prefetch.close()
+        print(f"[PREFETCH] session ended: {prefetch.report()}")
+
+    session.on_ended(_end_prefetch)
+
     @reactive.Effect
-    async def _auto_refresh_timer():
+    def _auto_refresh_watch():
         if not input.auto_refresh():
+            _stop_watching()
             return
 
         try:
             sec = int(input.auto_refresh_sec() or 30)
         except Exception:
             sec = 30
-
         sec = max(5, sec)
-        reactive.invalidate_later(sec * 1000)
 
         proj = _get_project_value()
-        if proj and projects.get():
-            status_state.set(f"Auto-refreshing every {sec}s…")
-            await _load_objects_async()
+        if not proj or not projects.get():
+            return
+
+        sf = "" if input.subfolder() == "(project root)" else (input.subfolder() or "")
+        prefix = _normalize_prefix(f"{BASE_PREFIX}{proj}/{sf}")
+
+        with reactive.isolate():
+            old = watcher.get()
+        if old is not None and old.prefix == prefix and old.bucket == input.bucket():
+            old.subscribe(_watch["token"], sec)  # interval may have changed
+            return
+
+        _stop_watching()
+        w = _watch_prefix(input.region(), input.bucket(), prefix, _watch["token"], sec)
+        _watch["seen"] = w.version
+        watcher.set(w)
+        status_state.set(f"Auto-refresh: watching {prefix} for changes (checks back off when idle).")
+
+    @reactive.Effect
+    async def _auto_refresh_on_change():
+        w = watcher.get()
+        if w is None:
+            return
+        reactive.invalidate_later(WATCH_POLL_SEC)
+
+        version = w.version
+        if version == _watch["seen"]:
+            return
+
+        with reactive.isolate():
+            busy = is_loading_objects.get()
+        if busy:
+            return  # the running listing may predate the change: retry on the next poll
+        # the version seen when this listing starts; later changes trigger another one
+        _watch["seen"] = version
+        await _load_objects_async()
+        status_state.set(f"Auto-refreshed. {w.status}")
 
     # ---------------------------
     # Outputs
@@ -699,27 +1958,140 @@ def server(input, output, session):
         s = selected_sample.get()
         return ui.div(ui.strong("Sample:"), ui.code(s)) if s else ui.em("No sample selected")
 
+    # ---------------------------
+    # Filtering (raw files view)
+    # ---------------------------
+    filter_text = reactive.Value("")
+    _filter_edit = {"raw": None, "at": 0.0}
+    # last substring match, so typing more characters only rescans the previous hits
+    _filter_memo: Dict[str, Any] = {"df": None, "needle": "", "pos": None}
+
+    @reactive.Effect
+    def _debounce_filter():
+        raw = (input.filter() or "").strip()
+        now = time.monotonic()
+        if raw != _filter_edit["raw"]:
+            _filter_edit.update(raw=raw, at=now)
+
+        wait = FILTER_DEBOUNCE_SEC - (now - _filter_edit["at"])
+        if wait > 0:
+            reactive.invalidate_later(wait)
+            return
+        filter_text.set(raw)
+
+    @reactive.Calc
+    def key_facts() -> Dict[str, Any]:
+        # computed once per listing, reused by every filter keystroke
+        dff = df.get()
+        keys = dff["key"].astype(str).tolist() if not dff.empty else []
+        return {
+            "low": np.array([k.lower() for k in keys], dtype=object),
+            "ext": np.array([_key_ext(k) for k in keys], dtype=object),
+        }
+
+    @reactive.Calc
+    def filter_pattern():
+        try:
+            return _compile_key_filter(filter_text.get()), ""
+        except re.error as e:
+            return None, f"Invalid filter pattern: {e}"
+
+    @reactive.Effect
+    def _update_ext_facets():
+        ext = key_facts()["ext"]
+        values, counts = np.unique(ext, return_counts=True) if len(ext) else ([], [])
+        choices = {str(v): f"{v} ({n})" for v, n in zip(values, counts)}
+        with reactive.isolate():
+            keep = [e for e in (input.ext_filter() or ()) if e in choices]
+        ui.update_selectize("ext_filter", choices=choices, selected=keep)
+
     @reactive.Calc
     def df_filtered() -> pd.DataFrame:
         dff = df.get()
         if dff.empty:
             return dff
 
-        needle = (input.filter() or "").strip().lower()
-        if not needle:
-            return dff
+        facts = key_facts()
+        needle = filter_text.get()
+        exts = list(input.ext_filter() or ())
+        pos = np.arange(len(dff))
+
+        if needle:
+            pat, err = filter_pattern()
+            if err:
+                return dff.iloc[0:0]
+
+            mode, p = pat
+            if mode == "contains":
+                memo = _filter_memo
+                if memo["df"] is dff and memo["needle"] and memo["needle"] in p:
+                    pos = memo["pos"]
+                low = facts["low"]
+                pos = pos[np.fromiter((p in low[i] for i in pos), dtype=bool, count=len(pos))]
+                _filter_memo.update(df=dff, needle=p, pos=pos)
+            else:
+                keys = dff["key"].astype(str).to_numpy(dtype=object)
+                pos = pos[np.fromiter((p.search(k) is not None for k in keys), dtype=bool, count=len(pos))]
 
-        mask = dff["key"].astype(str).str.lower().str.contains(needle, na=False)
-        return dff[mask].reset_index(drop=True)
+        if exts:
+            pos = pos[np.isin(facts["ext"][pos], exts)]
+
+        if len(pos) == len(dff):
+            return dff
+        return dff.iloc[pos].reset_index(drop=True)
 
     @output
     @render.ui
     def table():
+        if input.view_mode() != "samples":
+            _, err = filter_pattern()
+            if err:
+                return ui.em(err)
+
         dff = samples_df() if input.view_mode() == "samples" else df_filtered()
         if dff.empty:
             return ui.em("No objects")
+        if len(dff) > TABLE_MAX_ROWS:
+            # row numbers stay those of the full (filtered) view, so 'Select row #' still works
+            return ui.div(
+                ui.tags.small(f"Showing first {TABLE_MAX_ROWS} of {len(dff)} rows. Narrow the filter to see more."),
+                ui.HTML(dff.head(TABLE_MAX_ROWS).to_html(index=True, escape=True)),
+            )
         return ui.HTML(dff.to_html(index=True, escape=True))
 
+    @reactive.Calc
+    def search_hits() -> pd.DataFrame:
+        needle = (input.search_all() or "").strip()
+        idx = key_index.get()
+        if idx is None or not needle:
+            return pd.DataFrame()
+
+        if not idx.ready:
+            # first build still running: re-query so new hits show up
+            reactive.invalidate_later(5)
+        return idx.search(needle)
+
+    @output
+    @render.ui
+    def search_results():
+        if not KEY_INDEX_ENABLED:
+            return ui.em("Bucket search is disabled (RNASEQ_KEY_INDEX=0).")
+
+        idx = key_index.get()
+        if idx is None:
+            return ui.em("Bucket search starts once the bucket's projects have loaded.")
+        hits = search_hits()
+        if not (input.search_all() or "").strip():
+            return ui.div(ui.em("Type in 'Search all projects' to search every project."), ui.br(), ui.tags.small(idx.status))
+        if hits.empty:
+            return ui.div(ui.em("No matches."), ui.br(), ui.tags.small(idx.status))
+
+        more = f" (first {SEARCH_RESULT_LIMIT})" if len(hits) >= SEARCH_RESULT_LIMIT else ""
+        return ui.div(
+            ui.tags.small(f"{len(hits)} matches{more}. {idx.status}"),
+            ui.HTML(hits.to_html(index=True, escape=True)),
+        )
+
     @reactive.Effect
     @reactive.event(input.pick_sample_btn)
     def _pick_sample():
@@ -749,60 +2121,78 @@ def server(input, output, session):
         else:
             status_state.set(f"Selected sample '{sample}', but quant.sf was not found.")
 
+        if PREFETCH_ENABLED:
+            _warm_sample(sample)
+
+    def _warm_sample(sample: str) -> None:
+        # in the order the buttons are usually clicked; cheap presigns first
+        keys = {kind: _find_key_for_sample(sample, kind) for kind in ("log", "meta", "quant", "fastqc")}
+        jobs = [("url", keys[k]) for k in ("log", "meta", "quant") if keys[k]]
+        jobs += [("head", keys[k]) for k in ("log", "meta") if keys[k]]
+        if keys["fastqc"]:
+            jobs.append(("report", keys["fastqc"]))
+        prefetch.warm(_s3(), input.bucket(), sample, jobs)
+
     @reactive.Effect
     @reactive.event(input.view_fastqc)
     async def _view_fastqc():
         key = selected_key.get()
+        k = (key or "").lower().strip()
+        is_report = _is_report_zip(k) or k.endswith((".html", ".htm"))
+
+        # Samples mode auto-selects quant.sf; use that sample's FastQC report instead
+        if not is_report and input.view_mode() == "samples" and selected_sample.get():
+            key = _find_key_for_sample(selected_sample.get(), "fastqc") or key
+            k = (key or "").lower().strip()
+            is_report = _is_report_zip(k) or k.endswith((".html", ".htm"))
+
         if not key:
             status_state.set("No file selected.")
             return
-
-        k = key.lower().strip()
-
-        # -------------------------
-        # 1) ZIP reports (FastQC/QC)
-        # -------------------------
-        if _is_report_zip(k):
-            try:
-                url = await asyncio.to_thread(
-                    _extract_fastqc_zip_from_s3_to_www,
-                    s3.get(),
-                    input.bucket(),
-                    key,
-                )
-                await session.send_custom_message("open_fastqc", {"url": url})
-                status_state.set("Opened report from ZIP.")
-            except Exception as e:
-                status_state.set(f"Failed to open ZIP report: {e}")
+        if not is_report:
+            status_state.set("Selected file is not a ZIP report or HTML report.")
             return
 
-        # -------------------------
-        # 2) HTML reports (FastQC/QC)
-        # -------------------------
-        if k.endswith(".html") or k.endswith(".htm"):
-            try:
-                obj = s3.get().get_object(Bucket=input.bucket(), Key=key)
-                html = obj["Body"].read().decode("utf-8", errors="ignore")
+        # ZIP reports are extracted, HTML reports get Images/ + Icons/ presigned
+        kind = "ZIP" if _is_report_zip(k) else "HTML"
+        try:
+            url = await asyncio.to_thread(prefetch.get, "report", _s3(), input.bucket(), key)
+            await session.send_custom_message("open_fastqc", {"url": url})
+            status_state.set("Opened report from ZIP." if kind == "ZIP" else "Opened HTML report.")
+        except Exception as e:
+            status_state.set(f"Failed to open {kind} report: {e}")
 
-                # rewrite Images/ + Icons/ to presigned URLs
-                rewritten = _rewrite_fastqc_html(s3.get(), input.bucket(), key, html)
+       
 
-                local_name = _local_html_name_for_key(key)
-                out_path = WWW_DOWNLOADS_DIR / local_name
-                out_path.write_text(rewritten, encoding="utf-8")
+    @reactive.Effect
+    @reactive.event(input.search_go)
+    async def _go_to_search_hit():
+        hits = search_hits()
+        if hits.empty:
+            status_state.set("No search results. Type in 'Search all projects' first.")
+            return
 
-                await session.send_custom_message(
-                    "open_fastqc",
-                    {"url": f"/downloads/{local_name}"},
-                )
-                status_state.set("Opened HTML report.")
-            except Exception as e:
-                status_state.set(f"Failed to open HTML report: {e}")
+        try:
+            i = int(input.search_idx() or 0)
+        except Exception:
+            status_state.set("Search result # must be a number.")
             return
 
-        status_state.set("Selected file is not a ZIP report or HTML report.")
+        if i < 0 or i >= len(hits):
+            status_state.set(f"Search result out of range. Use 0 to {len(hits) - 1}.")
+            return
 
-       
+        hit = hits.iloc[i]
+        proj, subfolder, key = str(hit["project"]), str(hit["subfolder"]), str(hit["key"])
+
+        selected_project_pref.set(proj)
+        ui.update_select("project", selected=proj)
+        ui.update_select("subfolder", selected=subfolder)
+        ui.update_radio_buttons("view_mode", selected="files")
+
+        await _load_objects_async(proj=proj, subfolder=subfolder)
+        selected_key.set(key)
+        status_state.set(f"Jumped to {proj} / {subfolder} and selected search result {i}.")
 
     @reactive.Effect
     @reactive.event(input.pick_btn)
@@ -844,19 +2234,61 @@ def server(input, output, session):
     @output
     @render.text
     def preview_text():
-        # Text preview placeholder
-        return ""
+        # head of the last opened log / meta_info.json
+        return preview_state.get()
 
 
-APP_DIR = pathlib.Path(__file__).resolve().parent
-WWW_DIR = (APP_DIR / "www").resolve()
-print(f"[BOOT] app.py={__file__}  WWW_DIR={WWW_DIR}")
-
-app = App(
-    app_ui,
-    server,
-    static_assets={
-        "/": WWW_DIR,
-        "/downloads": WWW_DOWNLOADS_DIR,
-    },
-)
+def _startup_report() -> str:
+    """
+    Breakdown of where import + init time went (lazy imports are only
+    listed once something has used them).
+    """
+    total = sum(_STARTUP_TIMINGS.values())
+    lines = [
+        f"[BOOT] app.py={__file__}  WWW_DIR={WWW_DIR}",
+        f"[BOOT] module import took {_MODULE_IMPORT_SEC * 1000:.1f} ms",
+    ]
+    for label, sec in sorted(_STARTUP_TIMINGS.items(), key=lambda kv: -kv[1]):
+        pct = (100.0 * sec / total) if total else 0.0
+        lines.append(f"[BOOT] {sec * 1000:9.1f} ms  {pct:5.1f}%  {label}")
+    lines.append(f"[BOOT] {total * 1000:9.1f} ms  total (import + init so far)")
+    return "\n".join(lines)
+
+
+with _timed("build app"):
+    app = App(
+        app_ui,
+        server,
+        static_assets={
+            "/": WWW_DIR,
+            "/downloads": WWW_DOWNLOADS_DIR,
+        },
+    )
+
+_MODULE_IMPORT_SEC = time.perf_counter() - _BOOT_T0
+if STARTUP_REPORT:
+    print(_startup_report())
+
+
+def _prewarm_imports() -> None:
+    try:
+        for mod in (pd, boto3, botocore):
+            mod._load()
+        _make_s3(DEFAULT_REGION)
+    except Exception as e:
+        print("[WARN] prewarm failed:", repr(e))
+    if STARTUP_REPORT:
+        print(_startup_report())
+
+
+if PREWARM_IMPORTS and __name__ != "__main__":
+    threading.Thread(target=_prewarm_imports, name="prewarm-imports", daemon=True).start()
+
+
+if __name__ == "__main__":
+    # python app.py  ->  print the import/init breakdown, including the
+    # heavy deps that the server would otherwise load on first use
+    for mod in (pd, boto3, botocore, bs4):
+        mod._load()
+    _make_s3(DEFAULT_REGION)
+    print(_startup_report())
@@ -1,10 +1,69 @@
+"""
+Builds help-desk/manifests/ from the folder contents.
+
+Only the per-folder <folder>.json manifests are committed (they carry the
+hand-edited titles, tags and notes). Everything else is derived from the
+files and git-ignored: img/ (thumbnails), previews/ (spreadsheet pages),
+search/ (full-text index), bundle.*.json* and its index.json pointer.
+Run this script after checkout or whenever files change, before serving
+helpdesk.html. Without those outputs the page falls back to the per-folder
+manifests and the original images.
+"""
+import argparse
+import datetime as dt
+import functools
+import gzip
+import hashlib
 import json
+import logging
+import os
+import queue
 import re
+import shutil
+import sys
+import threading
+import time
+import zipfile
+import xml.etree.ElementTree as ET
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 
+# Optional: PDFs are left out of the text index without it (pip install pypdf)
+try:
+    import pypdf
+except ImportError:
+    pypdf = None
+# pypdf warns about every odd font; one summary line per failed file is enough
+logging.getLogger("pypdf").setLevel(logging.ERROR)
+
+# Optional: a .br copy of the manifest bundle next to the .gz one (pip install brotli)
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Optional: --watch uses filesystem notifications (inotify/FSEvents/...) when
+# available and falls back to polling otherwise (pip install watchdog)
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:
+    FileSystemEventHandler = Observer = None
+
+# Optional: image thumbnails/derivatives are skipped without it (pip install pillow)
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = ImageOps = None
+
 HELPDESK_DIR = Path(__file__).resolve().parent
 MANIFESTS_DIR = HELPDESK_DIR / "manifests"
 
+# path/size/mtime of every indexed file, per folder, from the previous run
+STATE_FILE = MANIFESTS_DIR / ".build-state.json"
+STATE_VERSION = 1
+
 # Folders you want to crawl recursively (photos are usually nested)
 RECURSIVE_FOLDERS = {
     "Group photo",
@@ -12,8 +71,8 @@ RECURSIVE_FOLDERS = {
 
 # File types to include
 ALLOWED_EXTS = {
-    ".pdf", ".doc", ".docx", ".ppt", ".pptx", ".xls", ".xlsx", ".csv",
-    ".png", ".jpg", ".jpeg", ".gif", ".webp", ".txt"
+    ".pdf", ".doc", ".docx", ".ppt", ".pptx", ".xls", ".xlsx", ".xlsm", ".csv",
+    ".png", ".jpg", ".jpeg", ".jfif", ".gif", ".webp", ".txt"
 }
 
 # Skip folders you don't want indexed
@@ -21,6 +80,61 @@ SKIP_DIRS = {
     "manifests", ".git", ".vscode", "__pycache__", "node_modules"
 }
 
+# Manifest fields people edit by hand; kept across rebuilds
+HAND_EDITED_FIELDS = ("title", "tags", "notes")
+# image/preview fields point into git-ignored outputs: they go into the bundle
+# (and the build state), never into the committed per-folder manifests
+DERIVED_FIELDS = ("width", "height", "sizes", "preview")
+
+# All manifests in one file, named by its content hash so it can be cached forever:
+#   manifests/bundle.<hash>.json (+ .gz/.br)   every folder's entries with size/mtime/sha256
+#   manifests/index.json                       {"bundle": "bundle.<hash>.json", ...}, tiny, revalidated
+BUNDLE_POINTER = MANIFESTS_DIR / "index.json"
+BUNDLE_VERSION = 1
+
+# Spreadsheet previews, so a quick lookup doesn't mean downloading the workbook:
+#   manifests/previews/<sha[:2]>/<sha>/index.json   sheets, row counts, first page of each
+#   manifests/previews/<sha[:2]>/<sha>/<sheet>-<page>.json
+# pages are columnar: {"rows": [excel row numbers], "cols": [[column A values], ...]}
+PREVIEW_DIR = MANIFESTS_DIR / "previews"
+PREVIEW_EXTS = {".xlsx", ".xlsm"}
+PREVIEW_PAGE_ROWS = 100
+PREVIEW_MAX_ROWS = 100_000
+PREVIEW_MAX_COLS = 60
+PREVIEW_MAX_CELL = 200
+
+# --watch: rebuild once a folder has been quiet this long, but never wait longer
+# than WATCH_MAX_WAIT_SEC while files keep arriving
+WATCH_DEBOUNCE_SEC = 1.0
+WATCH_MAX_WAIT_SEC = 10.0
+WATCH_POLL_SEC = 2.0
+
+# Full-text search index read by helpdesk.html:
+#   manifests/search/docs.json   doc list + shard names
+#   manifests/search/<xx>.json   {token: [[doc_id, count], ...]} for tokens starting with "xx"
+SEARCH_DIR = MANIFESTS_DIR / "search"
+SEARCH_VERSION = 2
+# extracted text per file content (sha256), so only changed documents are re-read;
+# bump TEXT_VERSION when extraction changes so cached text is redone
+TEXT_CACHE_DIR = MANIFESTS_DIR / ".text-cache"
+TEXT_VERSION = 2
+TEXT_EXTS = {".pdf", ".docx", ".xlsx", ".xlsm", ".pptx", ".txt", ".csv"}
+MAX_PDF_PAGES = 300
+TOKEN_RE = re.compile(r"[a-z0-9]+(?:[-.][a-z0-9]+)*")
+MAX_TOKEN_LEN = 40
+
+# Folders whose images get thumbnails + responsive sizes, so the page never
+# has to download the multi-MB originals just to show a list
+IMAGE_FOLDERS = {
+    "Group photo",
+}
+IMAGE_EXTS = {".jpg", ".jpeg", ".jfif", ".png", ".gif", ".webp"}
+# derivatives are named by source sha256: manifests/img/<sha[:2]>/<sha>-<width>.{webp,jpg}
+IMAGE_DIR = MANIFESTS_DIR / "img"
+IMAGE_WIDTHS = (160, 640, 1280)
+WEBP_QUALITY = 80
+JPEG_QUALITY = 82
+
 def slugify(name: str) -> str:
     s = (name or "").strip().lower()
     s = re.sub(r"[^\w\s-]", "", s)
@@ -34,42 +148,789 @@ def nice_title_from_filename(filename: str) -> str:
     stem = re.sub(r"\s+", " ", stem).strip()
     return stem
 
-def list_files(folder: Path, recursive: bool) -> list[Path]:
-    if recursive:
-        return [p for p in folder.rglob("*") if p.is_file()]
-    return [p for p in folder.iterdir() if p.is_file()]
+def scan_folder(folder: Path, recursive: bool) -> dict[str, list[int]]:
+    """
+    One os.scandir pass over folder -> {relative posix path: [size, mtime_ns]}.
+    Only files with an allowed extension are stat'ed.
+    """
+    files: dict[str, list[int]] = {}
+    stack = [(folder, "")]
+    while stack:
+        current, rel = stack.pop()
+        with os.scandir(current) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    if recursive and entry.name not in SKIP_DIRS:
+                        stack.append((Path(entry.path), f"{rel}{entry.name}/"))
+                    continue
+                if not entry.is_file() or Path(entry.name).suffix.lower() not in ALLOWED_EXTS:
+                    continue
+                st = entry.stat()
+                files[rel + entry.name] = [st.st_size, st.st_mtime_ns]
+    return files
 
-def main():
-    MANIFESTS_DIR.mkdir(parents=True, exist_ok=True)
+def load_json(path: Path, default):
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return default
+
+def write_atomic(path: Path, text: str) -> bool:
+    """
+    Writes text to path via a temp file + rename, only if it differs.
+    Returns True when the file was (re)written.
+    """
+    data = text.encode("utf-8")
+    try:
+        if path.read_bytes() == data:
+            return False
+    except OSError:
+        pass
+
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+    return True
+
+def build_items(files: dict[str, list[int]], previous: list) -> list[dict]:
+    # hand edits from the current manifest, keyed by file
+    edits = {}
+    for old in previous if isinstance(previous, list) else []:
+        if isinstance(old, dict) and old.get("file"):
+            edits[old["file"]] = old
+
+    items = []
+    for rel in sorted(files, key=str.lower):
+        item = {
+            "file": rel,  # supports nested paths
+            "title": nice_title_from_filename(rel),
+            "tags": [],
+            "notes": ""
+        }
+        old = edits.get(rel, {})
+        for field in HAND_EDITED_FIELDS:
+            if old.get(field):
+                item[field] = old[field]
+        items.append(item)
+    return items
+
+def file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def run_pool(fn, tasks: dict, jobs: int | None):
+    """
+    Runs fn(*args) for every {key: args} in a process pool and yields
+    (key, result) as they finish.
+    """
+    if not tasks:
+        return
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = {pool.submit(fn, *args): key for key, args in tasks.items()}
+        for fut in as_completed(futures):
+            yield futures[fut], fut.result()
+
+def hash_files(folders: dict, hashes: dict, jobs: int | None) -> None:
+    """
+    Brings hashes ({"<folder>/<file>": [size, mtime_ns, sha256]}) up to date;
+    only files whose size or mtime changed are read.
+    """
+    todo = {}
+    for name, folder in folders.items():
+        for rel, stat in folder["files"].items():
+            key = f"{name}/{rel}"
+            old = hashes.get(key)
+            if not (old and old[:2] == stat):
+                todo[key] = (str(HELPDESK_DIR / name / rel),)
+    if not todo:
+        return
+
+    t0 = time.perf_counter()
+    for key, sha in run_pool(file_sha256, todo, jobs):
+        name, rel = key.split("/", 1)
+        hashes[key] = folders[name]["files"][rel] + [sha]
+    print(f"Hashed {len(todo)} new or changed files in {time.perf_counter() - t0:.1f}s")
+
+def text_cache_path(sha: str) -> Path:
+    return TEXT_CACHE_DIR / f"v{TEXT_VERSION}" / sha[:2] / f"{sha}.txt.gz"
+
+WORD_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+DRAWING_NS = "{http://schemas.openxmlformats.org/drawingml/2006/main}"
+MC_FALLBACK = "{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback"
+
+def _zip_xml_text(path: Path, pattern: str, ns: str) -> str:
+    """
+    Text of the matching parts of a DOCX/PPTX (zipped XML): one line per
+    paragraph (<w:p>/<a:p>), made of its <w:t>/<a:t> runs joined with no
+    separator, since Word splits words across runs. Tabs and breaks become
+    spaces; anything else (drawing offsets, field codes, ids) is skipped.
+    """
+    para, text = f"{ns}p", f"{ns}t"
+    gaps = {f"{ns}tab", f"{ns}br", f"{ns}cr"}
+    lines = []
+
+    def walk(el, line):
+        for child in el:
+            if child.tag == para:
+                runs = []
+                walk(child, runs)  # text boxes nest paragraphs; they get their own line
+                lines.append("".join(runs))
+            elif child.tag == text:
+                line.append(child.text or "")
+            elif child.tag in gaps:
+                line.append(" ")
+            elif child.tag != MC_FALLBACK:  # the same content again, for old readers
+                walk(child, line)
+
+    rx = re.compile(pattern)
+    with zipfile.ZipFile(path) as z:
+        for name in sorted(n for n in z.namelist() if rx.fullmatch(n)):
+            walk(ET.fromstring(z.read(name)), [])
+    return "\n".join(line for line in lines if line.strip())
+
+def _xlsx_text(path: Path) -> str:
+    # sheet names and the values the preview shows (shared/inline strings, numbers,
+    # dates), not the raw <v> indices into sharedStrings
+    lines = []
+    for sheet, rows in read_xlsx(path):
+        lines.append(sheet)
+        for _, cells in rows:
+            lines.append(" ".join(str(v) for v in cells if v != "" and not isinstance(v, bool)))
+    return "\n".join(lines)
+
+def extract_text(path: Path) -> str:
+    ext = path.suffix.lower()
+    if ext == ".pdf":
+        if pypdf is None:
+            raise RuntimeError("pypdf is not installed")
+        reader = pypdf.PdfReader(str(path))
+        return "\n".join((page.extract_text() or "") for page in reader.pages[:MAX_PDF_PAGES])
+    if ext == ".docx":
+        return _zip_xml_text(path, r"word/(document|header\d*|footer\d*|footnotes)\.xml", WORD_NS)
+    if ext == ".pptx":
+        return _zip_xml_text(path, r"ppt/(slides/slide|notesSlides/notesSlide)\d+\.xml", DRAWING_NS)
+    if ext in (".xlsx", ".xlsm"):
+        return _xlsx_text(path)
+    if ext in (".txt", ".csv"):
+        return path.read_text(encoding="utf-8", errors="ignore")
+    return ""
+
+def extract_job(path_str: str, sha: str) -> str:
+    """
+    Process-pool worker: extracts the file's text into the cache entry for
+    its content hash. Returns an error message, or "".
+    """
+    out = text_cache_path(sha)
+    try:
+        text = extract_text(Path(path_str))
+    except Exception as e:
+        return f"{type(e).__name__}: {e}"
+
+    out.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out.with_name(f".{out.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(gzip.compress(text.encode("utf-8")))
+    os.replace(tmp, out)
+    return ""
+
+def image_meta_path(sha: str) -> Path:
+    return IMAGE_DIR / sha[:2] / f"{sha}.json"
+
+def image_job(path_str: str, sha: str) -> str:
+    """
+    Process-pool worker: writes the WebP/JPEG derivatives of one image under
+    its content hash. Returns an error message, or "".
+    """
+    meta_file = image_meta_path(sha)
+    if Image is None:
+        return "pillow is not installed"
+
+    try:
+        with Image.open(path_str) as im:
+            im = ImageOps.exif_transpose(im)
+            if im.mode not in ("RGB", "L"):
+                im = im.convert("RGB")
+            width, height = im.size
+
+            out_dir = meta_file.parent
+            out_dir.mkdir(parents=True, exist_ok=True)
+            sizes = []
+            for w in IMAGE_WIDTHS:
+                if w >= width and sizes:
+                    break
+                w = min(w, width)
+                h = max(1, round(height * w / width))
+                small = im.resize((w, h), Image.LANCZOS)
+                entry = {"w": w, "h": h}
+                for fmt, ext, opts in (("WEBP", "webp", {"quality": WEBP_QUALITY, "method": 4}),
+                                       ("JPEG", "jpg", {"quality": JPEG_QUALITY, "progressive": True})):
+                    out = out_dir / f"{sha}-{w}.{ext}"
+                    small.save(out, fmt, optimize=True, **opts)
+                    entry[ext] = out.relative_to(HELPDESK_DIR).as_posix()
+                sizes.append(entry)
+    except Exception as e:
+        return f"{type(e).__name__}: {e}"
+
+    # written last: its presence means every derivative above is complete
+    meta = {"width": width, "height": height, "sizes": sizes}
+    tmp = meta_file.with_name(f".{meta_file.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(meta), encoding="utf-8")
+    os.replace(tmp, meta_file)
+    return ""
+
+def build_images(folder: str, files: dict[str, list[int]], hashes: dict, jobs: int | None) -> dict[str, dict]:
+    """
+    Thumbnails and responsive sizes for the images of one folder, built in a
+    process pool and cached by source hash. Returns {relative path: meta}.
+    """
+    images = {rel: hashes[f"{folder}/{rel}"][2] for rel in files if Path(rel).suffix.lower() in IMAGE_EXTS}
+    # one job per distinct content; copies of an image share its derivatives
+    todo = {}
+    for rel, sha in images.items():
+        if sha not in todo and not image_meta_path(sha).exists():
+            todo[sha] = (str(HELPDESK_DIR / folder / rel), sha)
+
+    if todo:
+        t0 = time.perf_counter()
+        failed = 0
+        for sha, err in run_pool(image_job, todo, jobs):
+            if err:
+                failed += 1
+                print(f"  image: skipped {todo[sha][0]} ({err})")
+        print(f"Processed {len(todo) - failed}/{len(todo)} changed images in {folder} "
+              f"in {time.perf_counter() - t0:.1f}s")
+
+    metas = {}
+    for rel, sha in images.items():
+        meta = load_json(image_meta_path(sha), None)
+        if meta is not None:
+            metas[rel] = meta
+    return metas
+
+XLSX_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+XLSX_REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+# built-in number formats that are dates/times
+XLSX_DATE_FORMATS = set(range(14, 23)) | {45, 46, 47}
+
+def _xlsx_date_styles(z: zipfile.ZipFile) -> set[int]:
+    # indexes into cellXfs whose number format shows a date/time
+    try:
+        root = ET.fromstring(z.read("xl/styles.xml"))
+    except KeyError:
+        return set()
+    date_fmts = set(XLSX_DATE_FORMATS)
+    for fmt in root.iter(f"{XLSX_NS}numFmt"):
+        code = re.sub(r'"[^"]*"|\[[^\]]*\]|\\.', "", fmt.get("formatCode", "")).lower()
+        if re.search(r"[dmyhs]", code):
+            date_fmts.add(int(fmt.get("numFmtId", -1)))
+    xfs = root.find(f"{XLSX_NS}cellXfs")
+    return {i for i, xf in enumerate(xfs if xfs is not None else [])
+            if int(xf.get("numFmtId", 0)) in date_fmts}
+
+def _xlsx_serial_to_iso(value: float, date1904: bool) -> str:
+    base = dt.datetime(1904, 1, 1) if date1904 else dt.datetime(1899, 12, 30)
+    when = base + dt.timedelta(days=value)
+    if value == int(value):
+        return when.date().isoformat()
+    if value < 1:
+        return when.time().isoformat(timespec="minutes")
+    return when.isoformat(sep=" ", timespec="minutes")
+
+def _xlsx_col(ref: str) -> int:
+    n = 0
+    for ch in ref:
+        if not ch.isalpha():
+            break
+        n = n * 26 + ord(ch.upper()) - 64
+    return n - 1
+
+def read_xlsx(path: Path):
+    """
+    Yields (sheet name, [(excel row number, [cell values])]) for each
+    worksheet, reading the zipped XML directly. Cached formula results are
+    used, dates become ISO strings and empty rows are dropped.
+    """
+    with zipfile.ZipFile(path) as z:
+        wb = ET.fromstring(z.read("xl/workbook.xml"))
+        pr = wb.find(f"{XLSX_NS}workbookPr")
+        date1904 = pr is not None and pr.get("date1904") in ("1", "true")
+        rels = ET.fromstring(z.read("xl/_rels/workbook.xml.rels"))
+        targets = {r.get("Id"): r.get("Target", "") for r in rels}
 
-    for entry in sorted(HELPDESK_DIR.iterdir(), key=lambda p: p.name.lower()):
-        if not entry.is_dir():
+        strings = []
+        if "xl/sharedStrings.xml" in z.namelist():
+            for si in ET.fromstring(z.read("xl/sharedStrings.xml")).iter(f"{XLSX_NS}si"):
+                # plain <t>, or rich-text runs <r><t>; phonetic hints (<rPh>) are not part of the value
+                parts = si.findall(f"{XLSX_NS}t") or si.findall(f"{XLSX_NS}r/{XLSX_NS}t")
+                strings.append("".join(t.text or "" for t in parts))
+        date_styles = _xlsx_date_styles(z)
+
+        for sheet in wb.iter(f"{XLSX_NS}sheet"):
+            target = targets.get(sheet.get(f"{XLSX_REL_NS}id"), "")
+            name = target.lstrip("/") if target.startswith("/") else f"xl/{target}"
+            if name not in z.namelist():
+                continue  # chart sheets, missing parts
+
+            rows = []
+            with z.open(name) as f:
+                for _, el in ET.iterparse(f):
+                    if el.tag != f"{XLSX_NS}row":
+                        continue
+                    cells = {}
+                    for c in el.iter(f"{XLSX_NS}c"):
+                        kind = c.get("t", "n")
+                        if kind == "inlineStr":
+                            value = "".join(t.text or "" for t in c.iter(f"{XLSX_NS}t"))
+                        else:
+                            v = c.find(f"{XLSX_NS}v")
+                            if v is None or v.text is None:
+                                continue
+                            value = v.text
+                            if kind == "s":
+                                value = strings[int(value)] if int(value) < len(strings) else ""
+                            elif kind == "b":
+                                value = value == "1"
+                            elif kind == "n":
+                                num = float(value)
+                                if int(c.get("s", 0)) in date_styles:
+                                    value = _xlsx_serial_to_iso(num, date1904)
+                                else:
+                                    # 181291.87999999995 -> 181291.88, as Excel shows it
+                                    value = int(num) if num.is_integer() and abs(num) < 1e15 else float(f"{num:.12g}")
+                        if value == "":
+                            continue
+                        ref = c.get("r")
+                        cells[_xlsx_col(ref) if ref else len(cells)] = value
+                    if cells:
+                        width = max(cells) + 1
+                        rows.append((int(el.get("r", len(rows) + 1)), [cells.get(i, "") for i in range(width)]))
+                    el.clear()
+                    if len(rows) >= PREVIEW_MAX_ROWS:
+                        break
+            yield sheet.get("name", ""), rows
+
+def preview_dir(sha: str) -> Path:
+    return PREVIEW_DIR / sha[:2] / sha
+
+def _preview_cell(value):
+    return value[:PREVIEW_MAX_CELL] if isinstance(value, str) else value
+
+def preview_job(path_str: str, sha: str) -> str:
+    """
+    Process-pool worker: writes the paginated preview of one workbook
+    under its content hash. Returns an error message, or "".
+    """
+    out_dir = preview_dir(sha)
+    tmp_dir = out_dir.with_name(f".{sha}.{os.getpid()}.tmp")
+    try:
+        tmp_dir.mkdir(parents=True, exist_ok=True)
+        sheets = []
+        for n, (name, rows) in enumerate(read_xlsx(Path(path_str))):
+            ncols = min(PREVIEW_MAX_COLS, max((len(r) for _, r in rows), default=0))
+            pages = []
+            for start in range(0, len(rows), PREVIEW_PAGE_ROWS):
+                chunk = rows[start:start + PREVIEW_PAGE_ROWS]
+                pages.append({
+                    "rows": [num for num, _ in chunk],
+                    "cols": [[_preview_cell(r[c]) if c < len(r) else "" for _, r in chunk]
+                             for c in range(ncols)],
+                })
+            for p, page in enumerate(pages[1:], start=1):
+                (tmp_dir / f"{n}-{p}.json").write_text(
+                    json.dumps(page, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+            sheets.append({"name": name, "rows": len(rows), "cols": ncols, "pages": len(pages),
+                           "truncated": len(rows) >= PREVIEW_MAX_ROWS,
+                           "first": pages[0] if pages else {"rows": [], "cols": []}})
+
+        (tmp_dir / "index.json").write_text(json.dumps(
+            {"page_rows": PREVIEW_PAGE_ROWS, "sheets": sheets},
+            ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+        # the directory appears complete or not at all
+        shutil.rmtree(out_dir, ignore_errors=True)
+        os.replace(tmp_dir, out_dir)
+    except Exception as e:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        return f"{type(e).__name__}: {e}"
+    return ""
+
+def build_previews(folder: str, files: dict[str, list[int]], hashes: dict, jobs: int | None) -> dict[str, dict]:
+    """
+    Paginated previews for the workbooks of one folder, built in a process
+    pool and cached by content hash. Returns {relative path: {"preview": index path}}.
+    """
+    books = {rel: hashes[f"{folder}/{rel}"][2] for rel in files if Path(rel).suffix.lower() in PREVIEW_EXTS}
+    todo = {}
+    for rel, sha in books.items():
+        if sha not in todo and not (preview_dir(sha) / "index.json").exists():
+            todo[sha] = (str(HELPDESK_DIR / folder / rel), sha)
+
+    if todo:
+        t0 = time.perf_counter()
+        failed = 0
+        for sha, err in run_pool(preview_job, todo, jobs):
+            if err:
+                failed += 1
+                print(f"  preview: skipped {todo[sha][0]} ({err})")
+        print(f"Rendered {len(todo) - failed}/{len(todo)} changed spreadsheet previews in {folder} "
+              f"in {time.perf_counter() - t0:.1f}s")
+
+    out = {}
+    for rel, sha in books.items():
+        index = preview_dir(sha) / "index.json"
+        if index.exists():
+            out[rel] = {"preview": index.relative_to(HELPDESK_DIR).as_posix()}
+    return out
+
+def tokenize(text: str) -> list[str]:
+    # "1-methyl-2-pyrrolidinone" -> the whole term plus each part (helpdesk.html does the same)
+    out = []
+    for m in TOKEN_RE.findall(text.lower()):
+        if len(m) > MAX_TOKEN_LEN:
             continue
+        if len(m) >= 2:
+            out.append(m)
+        if "-" in m or "." in m:
+            out.extend(p for p in re.split(r"[-.]", m) if len(p) >= 2)
+    return out
+
+@functools.lru_cache(maxsize=None)
+def doc_terms(sha: str, rel: str, has_text: bool) -> Counter:
+    # memoised so --watch rebuilds only re-tokenize documents that changed;
+    # has_text is part of the key so a later successful extraction is picked up
+    path = text_cache_path(sha)
+    text = gzip.decompress(path.read_bytes()).decode("utf-8") if has_text else ""
+    # file name and title are searchable too
+    return Counter(tokenize(f"{rel} {text}"))
+
+def build_search_index(all_items: dict, folders: dict, hashes: dict, jobs: int | None,
+                       full: bool = False) -> None:
+    """
+    Extracts text from every indexable document (process pool, cached by
+    content hash) and writes the sharded inverted index to SEARCH_DIR.
+    Failed extractions are not cached, so they are retried on the next run.
+    """
+    docs = []
+    for folder in sorted(all_items, key=str.lower):
+        for it in all_items[folder]:
+            rel = it["file"]
+            if Path(rel).suffix.lower() in TEXT_EXTS and rel in folders[folder]["files"]:
+                docs.append((folder, rel, it.get("title") or nice_title_from_filename(rel)))
+
+    # text from an older extractor is never read again
+    if TEXT_CACHE_DIR.is_dir():
+        for old in TEXT_CACHE_DIR.iterdir():
+            if old.name != f"v{TEXT_VERSION}":
+                shutil.rmtree(old, ignore_errors=True)
+
+    # one extraction per distinct content; copies of a file share the cache entry
+    todo = {}
+    for folder, rel, _ in docs:
+        sha = hashes[f"{folder}/{rel}"][2]
+        if sha not in todo and not text_cache_path(sha).exists():
+            todo[sha] = (str(HELPDESK_DIR / folder / rel), sha)
+
+    if todo:
+        t0 = time.perf_counter()
+        failed = 0
+        for sha, err in run_pool(extract_job, todo, jobs):
+            if err:
+                failed += 1
+                print(f"  text: skipped {todo[sha][0]} ({err})")
+        print(f"Extracted text from {len(todo) - failed}/{len(todo)} changed documents "
+              f"in {time.perf_counter() - t0:.1f}s")
+
+    # whether text was extracted is part of the signature: a document whose
+    # extraction failed before (e.g. no pypdf) must be re-indexed once it works
+    shas = [hashes[f"{f}/{r}"][2] for f, r, _ in docs]
+    has_text = {sha: text_cache_path(sha).exists() for sha in set(shas)}
+    signature = hashlib.sha1(json.dumps(
+        [SEARCH_VERSION] + [[f, r, t, sha, has_text[sha]] for (f, r, t), sha in zip(docs, shas)]
+    ).encode("utf-8")).hexdigest()
+    docs_file = SEARCH_DIR / "docs.json"
+    if not full and load_json(docs_file, {}).get("signature") == signature:
+        print("Search index unchanged")
+        return
+
+    postings: dict[str, list] = defaultdict(list)
+    for doc_id, ((folder, rel, _), sha) in enumerate(zip(docs, shas)):
+        for tok, n in doc_terms(sha, rel, has_text[sha]).items():
+            postings[tok].append([doc_id, n])
+
+    shards: dict[str, dict] = defaultdict(dict)
+    for tok in sorted(postings):
+        shards[tok[:2]][tok] = postings[tok]
+
+    SEARCH_DIR.mkdir(parents=True, exist_ok=True)
+    for name, body in shards.items():
+        write_atomic(SEARCH_DIR / f"{name}.json", json.dumps(body, separators=(",", ":")))
+    for stale in SEARCH_DIR.glob("*.json"):
+        if stale.name != "docs.json" and stale.stem not in shards:
+            stale.unlink()
+
+    write_atomic(docs_file, json.dumps({
+        "version": SEARCH_VERSION,
+        "signature": signature,
+        "docs": [{"folder": f, "file": r, "title": t} for f, r, t in docs],
+        "shards": sorted(shards),
+    }, ensure_ascii=False, separators=(",", ":")))
+    print(f"Wrote search index ({len(docs)} documents, {len(postings)} terms, {len(shards)} shards)")
+
+def write_bundle(all_items: dict, hashes: dict) -> None:
+    """
+    Writes every folder's entries, with size/mtime/sha256, to one
+    content-named bundle plus .gz (and .br) copies, then points
+    BUNDLE_POINTER at it. Files with identical content get "same_as"
+    set to the first copy, so the page links (and the browser caches) one URL.
+    """
+    folders = {}
+    first_by_sha: dict[str, str] = {}
+    dupes = []
+    for folder in sorted(all_items, key=str.lower):
+        entries = []
+        for it in all_items[folder]:
+            key = f"{folder}/{it.get('file', '')}"
+            if key not in hashes:
+                continue
+            size, mtime_ns, sha = hashes[key]
+            entry = dict(it, size=size, sha256=sha,
+                         mtime=time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(mtime_ns // 1_000_000_000)))
+            first = first_by_sha.setdefault(sha, key)
+            if first != key:
+                entry["same_as"] = first
+                dupes.append((key, first))
+            entries.append(entry)
+        folders[folder] = entries
+
+    body = json.dumps({"version": BUNDLE_VERSION, "folders": folders},
+                      ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    digest = hashlib.sha256(body).hexdigest()
+    name = f"bundle.{digest[:16]}.json"
+    previous = load_json(BUNDLE_POINTER, {}).get("bundle")
+    if previous == name and (MANIFESTS_DIR / name).exists():
+        print("Bundle unchanged")
+        return
+
+    variants = {name: body, f"{name}.gz": gzip.compress(body, 9, mtime=0)}
+    if brotli is not None:
+        variants[f"{name}.br"] = brotli.compress(body)
+    for fname, data in variants.items():
+        tmp = MANIFESTS_DIR / f".{fname}.tmp"
+        tmp.write_bytes(data)
+        os.replace(tmp, MANIFESTS_DIR / fname)
+
+    write_atomic(BUNDLE_POINTER, json.dumps(
+        {"bundle": name, "size": len(body), "sha256": digest}, indent=2))
+    # keep the previous bundle for pages that loaded the old pointer a moment ago
+    for stale in MANIFESTS_DIR.glob("bundle.*.json*"):
+        if not stale.name.startswith((name, previous or name)):
+            stale.unlink()
+    gz = len(variants[f"{name}.gz"])
+    print(f"Wrote {name} ({len(body) / 1024:.0f} KB, {gz / 1024:.0f} KB gzip, {len(dupes)} duplicates)")
+    for key, first in dupes:
+        print(f"  duplicate: {key} == {first}")
+
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description="Build help-desk/manifests/*.json from the folder contents.")
+    p.add_argument("--full", action="store_true",
+                   help="ignore the saved state and rebuild every manifest and the search index")
+    p.add_argument("--no-images", action="store_true",
+                   help="skip thumbnails and responsive image sizes")
+    p.add_argument("--no-previews", action="store_true",
+                   help="skip the paginated XLSX/XLSM previews")
+    p.add_argument("--no-text", action="store_true",
+                   help="skip text extraction and the full-text search index")
+    p.add_argument("--jobs", type=int, default=None,
+                   help="worker processes for hashing, images, previews and text (default: CPU count)")
+    p.add_argument("--watch", action="store_true",
+                   help="after building, keep running and rebuild folders as they change")
+    p.add_argument("--poll", action="store_true",
+                   help="with --watch, poll the folders instead of using filesystem notifications")
+    p.add_argument("--debounce", type=float, default=WATCH_DEBOUNCE_SEC,
+                   help=f"with --watch, seconds of quiet before rebuilding (default: {WATCH_DEBOUNCE_SEC})")
+    return p.parse_args(argv)
+
+def build(args, only: set[str] | None = None, full: bool = False) -> dict:
+    """
+    One incremental build. With only, just those folders are rescanned;
+    the others keep their file list from the saved state. Returns counts
+    and per-step timings.
+    """
+    timings = {}
+    t = time.perf_counter()
+    MANIFESTS_DIR.mkdir(parents=True, exist_ok=True)
+
+    state = {} if full else load_json(STATE_FILE, {})
+    if state.get("version") != STATE_VERSION:
+        state = {}
+    old_folders = state.get("folders", {})
+    new_folders = {}
+    all_items = {}
+    written = unchanged = skipped = 0
+
+    with os.scandir(HELPDESK_DIR) as it:
+        entries = sorted((e for e in it if e.is_dir()), key=lambda e: e.name.lower())
+    for entry in entries:
         if entry.name in SKIP_DIRS:
             continue
+        if only is not None and entry.name not in only and entry.name in old_folders:
+            new_folders[entry.name] = old_folders[entry.name]
+        else:
+            files = scan_folder(Path(entry.path), entry.name in RECURSIVE_FOLDERS)
+            new_folders[entry.name] = {"files": files}
+    timings["scan"] = time.perf_counter() - t
 
-        folder_name = entry.name
-        recursive = folder_name in RECURSIVE_FOLDERS
+    # content hashes by "<folder>/<file>", shared by the bundle, image and text steps
+    t = time.perf_counter()
+    live = {f"{name}/{rel}" for name, folder in new_folders.items() for rel in folder["files"]}
+    hashes = {k: v for k, v in state.get("hashes", {}).items() if k in live}
+    hash_files(new_folders, hashes, args.jobs)
+    timings["hash"] = time.perf_counter() - t
 
-        files = list_files(entry, recursive)
+    t = time.perf_counter()
+    for folder_name, folder in new_folders.items():
+        files = folder["files"]
+        out_file = MANIFESTS_DIR / f"{slugify(folder_name)}.json"
 
-        items = []
-        for f in sorted(files, key=lambda p: str(p).lower()):
-            ext = f.suffix.lower()
-            if ext not in ALLOWED_EXTS:
+        with_images = folder_name in IMAGE_FOLDERS and not args.no_images and Image is not None
+        with_previews = not args.no_previews
+        prev = old_folders.get(folder_name)
+        if prev and prev.get("files") == files and out_file.exists():
+            items = load_json(out_file, [])
+            derived = prev.get("derived", {})
+            # unchanged, unless derivatives are still missing (e.g. pillow was absent last run)
+            # or the manifest still has derived fields written by an older build
+            exts = [(derived.get(it.get("file", ""), {}), Path(it.get("file", "")).suffix.lower()) for it in items]
+            if (not with_images or all("sizes" in d for d, ext in exts if ext in IMAGE_EXTS)) and \
+                    (not with_previews or all("preview" in d for d, ext in exts if ext in PREVIEW_EXTS)) and \
+                    not any(f in it for it in items for f in DERIVED_FIELDS):
+                folder["derived"] = derived
+                all_items[folder_name] = [dict(it, **derived.get(it.get("file", ""), {})) for it in items]
+                skipped += 1
                 continue
 
-            rel = f.relative_to(entry).as_posix()  # supports nested paths
-            items.append({
-                "file": rel,
-                "title": nice_title_from_filename(f.name),
-                "tags": [],
-                "notes": ""
-            })
+        items = build_items(files, load_json(out_file, []))
+        derived = {}
+        if with_images:
+            derived.update(build_images(folder_name, files, hashes, args.jobs))
+        if with_previews:
+            derived.update(build_previews(folder_name, files, hashes, args.jobs))
+        folder["derived"] = derived
+        all_items[folder_name] = [dict(it, **derived.get(it["file"], {})) for it in items]
+        # the manifest keeps only file + hand-edited fields
+        text = json.dumps(items, indent=2, ensure_ascii=False)
+        if write_atomic(out_file, text):
+            written += 1
+            print(f"Wrote {out_file.name} ({len(items)} items)")
+        else:
+            unchanged += 1
+            print(f"Unchanged {out_file.name} ({len(items)} items)")
+    timings["manifests"] = time.perf_counter() - t
 
-        out_file = MANIFESTS_DIR / f"{slugify(folder_name)}.json"
-        out_file.write_text(json.dumps(items, indent=2, ensure_ascii=False), encoding="utf-8")
-        print(f"Wrote {out_file.name} ({len(items)} items)")
+    t = time.perf_counter()
+    write_bundle(all_items, hashes)
+    timings["bundle"] = time.perf_counter() - t
+    if not args.no_text:
+        t = time.perf_counter()
+        build_search_index(all_items, new_folders, hashes, args.jobs, full=full)
+        timings["search"] = time.perf_counter() - t
+
+    write_atomic(STATE_FILE, json.dumps({"version": STATE_VERSION, "folders": new_folders, "hashes": hashes}))
+    return {"written": written, "unchanged": unchanged, "skipped": skipped, "timings": timings}
+
+def folder_of(path: str) -> str | None:
+    """Top-level help-desk folder a changed path belongs to, or None if it doesn't matter."""
+    try:
+        rel = Path(path).resolve().relative_to(HELPDESK_DIR)
+    except ValueError:
+        return None
+    if len(rel.parts) < 2 or rel.parts[0] in SKIP_DIRS or rel.name.startswith("."):
+        # top-level files (helpdesk.html, this script), our own output, temp files
+        return None
+    return rel.parts[0]
+
+def _start_notifier(changes: queue.Queue):
+    class Handler(FileSystemEventHandler):
+        def on_any_event(self, event):
+            if event.event_type in ("opened", "closed_no_write"):
+                return
+            for path in (event.src_path, getattr(event, "dest_path", "")):
+                folder = folder_of(path) if path else None
+                if folder:
+                    changes.put(folder)
+
+    observer = Observer()
+    observer.schedule(Handler(), str(HELPDESK_DIR), recursive=True)
+    observer.daemon = True
+    observer.start()
+    return observer
+
+def _poll_loop(changes: queue.Queue, interval: float):
+    # scan_folder only stats files with an allowed extension, so a pass is cheap
+    def snapshot():
+        snap = {}
+        with os.scandir(HELPDESK_DIR) as it:
+            for e in it:
+                if e.is_dir() and e.name not in SKIP_DIRS:
+                    snap[e.name] = scan_folder(Path(e.path), e.name in RECURSIVE_FOLDERS)
+        return snap
+
+    last = snapshot()
+    while True:
+        time.sleep(interval)
+        try:
+            current = snapshot()
+        except OSError:
+            continue
+        for name in set(last) | set(current):
+            if last.get(name) != current.get(name):
+                changes.put(name)
+        last = current
+
+def watch(args) -> None:
+    sys.stdout.reconfigure(line_buffering=True)  # timings show up promptly in service logs
+    changes: queue.Queue = queue.Queue()
+    if Observer is not None and not args.poll:
+        _start_notifier(changes)
+        print(f"[watch] watching {HELPDESK_DIR} for changes (Ctrl+C to stop)")
+    else:
+        threading.Thread(target=_poll_loop, args=(changes, WATCH_POLL_SEC), daemon=True).start()
+        print(f"[watch] polling {HELPDESK_DIR} every {WATCH_POLL_SEC:g}s (Ctrl+C to stop)")
+
+    while True:
+        pending = {changes.get()}
+        # debounce: a copy of 50 photos is one rebuild, not 50
+        started = time.monotonic()
+        while time.monotonic() - started < WATCH_MAX_WAIT_SEC:
+            try:
+                pending.add(changes.get(timeout=args.debounce))
+            except queue.Empty:
+                break
+
+        t0 = time.perf_counter()
+        print(f"[watch] change in {', '.join(sorted(pending))}")
+        try:
+            result = build(args, only=pending)
+        except Exception as e:
+            print(f"[watch] rebuild failed: {type(e).__name__}: {e}")
+            continue
+        steps = ", ".join(f"{k} {v:.2f}s" for k, v in result["timings"].items())
+        print(f"[watch] rebuilt in {time.perf_counter() - t0:.2f}s "
+              f"({result['written']} manifests written; {steps})")
+
+def main(argv=None):
+    args = parse_args(argv)
+    t0 = time.perf_counter()
+    result = build(args, full=args.full)
+    print(f"Done in {time.perf_counter() - t0:.2f}s: {result['written']} written, "
+          f"{result['unchanged']} unchanged, {result['skipped']} folders untouched since last run")
+
+    if args.watch:
+        try:
+            watch(args)
+        except KeyboardInterrupt:
+            print("[watch] stopped")
 
 if __name__ == "__main__":
     main()
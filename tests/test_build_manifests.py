@@ -0,0 +1,42 @@
+"""
+Text extraction in help-desk/build-manifests.py, run on documents in the repo.
+"""
+import importlib.util
+import pathlib
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+HELPDESK = ROOT / "help-desk"
+
+_spec = importlib.util.spec_from_file_location("build_manifests", HELPDESK / "build-manifests.py")
+bm = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(bm)
+
+
+def test_docx_runs_join_into_words():
+    text = bm.extract_text(HELPDESK / "Production" / "Raw material, instrument logbook.docx")
+
+    # Word splits these words across runs ("M" + "aintenance", "a" + "bnormal")
+    assert "Maintenance Logbook" in text
+    assert "Perform mixer and Y-connector cleaning only if flow rate and pressure are abnormal" in text.splitlines()
+    terms = set(bm.tokenize(text))
+    assert {"abnormal", "perform", "maintenance"} <= terms
+    assert not {"bnormal", "erform", "aintenance"} & terms
+
+
+def test_docx_skips_drawing_markup():
+    text = bm.extract_text(HELPDESK / "Document Template" / "Synoligo Corporate Letterhead 2024 Final.docx")
+
+    assert "Morrisville, NC 27560 U.S.A" in text
+    assert "2847975" not in text  # a <wp:posOffset>, not text
+
+
+def test_xlsx_uses_cell_values_not_string_indices():
+    path = HELPDESK / "Production" / "Project Tracking.xlsx"
+    text = bm.extract_text(path)
+
+    shown = []  # what the preview shows: sheet names and cell values
+    for sheet, rows in bm.read_xlsx(path):
+        shown.append(sheet)
+        shown += [str(v) for _, cells in rows for v in cells if v != ""]
+    assert "Status Tracking" in text.splitlines()
+    assert set(bm.tokenize(text)) <= set(bm.tokenize(" ".join(shown)))
@@ -0,0 +1,134 @@
+"""
+S3 Inventory listing backend against the local fixture report in
+tests/fixtures/inventory/ (a mirror of <dest>/<bucket>/<config-id>/).
+"""
+import pathlib
+import sys
+from datetime import datetime, timezone
+
+import pytest
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import app  # noqa: E402
+
+INVENTORY_DIR = ROOT / "tests" / "fixtures" / "inventory" / "rnaseqdatabase" / "daily-all"
+BEFORE = datetime(2026, 9, 29, 9, tzinfo=timezone.utc)
+AFTER = datetime(2026, 10, 2, 9, tzinfo=timezone.utc)  # newer than the report
+
+
+class FakeS3:
+    """Just enough list_objects_v2 for the reconcile LISTs (one page, optional delimiter)."""
+
+    def __init__(self, objects):
+        self.objects = {k: {"Key": k, "Size": size, "LastModified": lm} for k, (size, lm) in objects.items()}
+        self.calls = []
+
+    def list_objects_v2(self, Bucket, Prefix, Delimiter=None, MaxKeys=1000, ContinuationToken=None):
+        self.calls.append((Prefix, Delimiter))
+        contents, prefixes = [], set()
+        for k in sorted(self.objects):
+            if not k.startswith(Prefix):
+                continue
+            rest = k[len(Prefix):]
+            if Delimiter and Delimiter in rest:
+                prefixes.add(Prefix + rest.split(Delimiter, 1)[0] + Delimiter)
+            else:
+                contents.append(self.objects[k])
+        return {
+            "Contents": contents,
+            "CommonPrefixes": [{"Prefix": p} for p in sorted(prefixes)],
+            "IsTruncated": False,
+        }
+
+
+@pytest.fixture
+def inventory(monkeypatch, tmp_path):
+    monkeypatch.setattr(app, "LISTING_BACKEND", "inventory")
+    monkeypatch.setattr(app, "INVENTORY_URI", str(INVENTORY_DIR))
+    monkeypatch.setattr(app, "CACHE_DIR", tmp_path)
+    monkeypatch.setattr(app, "_INVENTORY", {"store": None, "version": None, "checked": 0.0})
+    return tmp_path
+
+
+def _keys(objects):
+    return sorted(o["Key"] for o in objects)
+
+
+def test_reads_fixture_report(inventory, monkeypatch):
+    monkeypatch.setattr(app, "INVENTORY_RECONCILE", False)
+    s3 = FakeS3({})
+
+    store = app._inventory_store(s3, "rnaseqdatabase")
+    assert store.projects() == ["P1", "P2"]
+    assert store.created == datetime(2026, 10, 1, 1, tzinfo=timezone.utc)
+
+    objs = app._inventory_objects(s3, "rnaseqdatabase", "vendor-data/P1/Fastq/")
+    # CSV keys are URL-encoded; keys outside BASE_PREFIX are dropped
+    assert _keys(objs) == ["vendor-data/P1/Fastq/S0_R1.fastq.gz", "vendor-data/P1/Fastq/S1 R1 copy.fastq.gz"]
+    assert s3.calls == []
+
+    df = app._list_objects(s3, "rnaseqdatabase", "vendor-data/P2/")
+    assert df["key"].tolist() == ["vendor-data/P2/Fastq/A_R1.fastq.gz"]
+    assert df["storage_class"].tolist() == ["GLACIER"]
+    assert list(inventory.glob("inventory_*.pkl"))
+
+
+def test_reconcile_finds_samples_newer_than_report(inventory):
+    s3 = FakeS3(
+        {
+            "vendor-data/P1/Fastq/S0_R1.fastq.gz": (1000, BEFORE),
+            "vendor-data/P1/Fastq/S1 R1 copy.fastq.gz": (1000, BEFORE),
+            "vendor-data/P1/Salmon_Quant/S0.done": (0, BEFORE),
+            "vendor-data/P1/Salmon_Quant/S0/quant.sf": (200, BEFORE),
+            "vendor-data/P1/Salmon_Quant/S0/logs/salmon_quant.log": (50, BEFORE),
+            # S1 finished after the report
+            "vendor-data/P1/Salmon_Quant/S1.done": (0, AFTER),
+            "vendor-data/P1/Salmon_Quant/S1/quant.sf": (210, AFTER),
+            "vendor-data/P1/Salmon_Quant/S1/logs/salmon_quant.log": (60, AFTER),
+            # S2 did not exist yet
+            "vendor-data/P1/Salmon_Quant/S2.done": (0, AFTER),
+            "vendor-data/P1/Salmon_Quant/S2/quant.sf": (220, AFTER),
+            # README.txt was deleted
+        }
+    )
+
+    keys = _keys(app._inventory_objects(s3, "rnaseqdatabase", "vendor-data/P1/"))
+
+    assert keys == sorted(s3.objects)
+    assert ("vendor-data/P1/Salmon_Quant/", "/") in s3.calls
+    # known, unchanged folders are not listed in full
+    assert ("vendor-data/P1/Fastq/", None) not in s3.calls
+    assert ("vendor-data/P1/Salmon_Quant/S0/", None) not in s3.calls
+
+
+def test_old_snapshots_are_pruned(inventory):
+    app._inventory_store(FakeS3({}), "rnaseqdatabase")
+    (current,) = inventory.glob("inventory_*.pkl")
+    cfg = current.name.split("_")[1]
+    stale = inventory / f"inventory_{cfg}_000000000000.pkl"
+    stale.write_bytes(b"older report")
+    other = inventory / "inventory_00000000_000000000000.pkl"
+    other.write_bytes(b"another RNASEQ_INVENTORY_URI")
+    current.unlink()
+    app._INVENTORY.update(store=None, version=None)
+
+    app._inventory_store(FakeS3({}), "rnaseqdatabase")
+
+    assert current.exists()
+    assert not stale.exists()
+    assert other.exists()
+    assert not list(inventory.glob("*.tmp"))
+
+
+def test_key_index_reads_inventory(inventory):
+    s3 = FakeS3({"vendor-data/P1/Salmon_Quant/S0/quant.sf": (200, BEFORE)})
+
+    idx = app._KeyIndex("us-east-2", "rnaseqdatabase")
+    idx._index_project(s3, "P1")
+
+    assert idx.search("quant.sf")["key"].tolist() == ["vendor-data/P1/Salmon_Quant/S0/quant.sf"]
+    # only the reconcile LISTs, never a full LIST of the project
+    assert all(delim == "/" for _, delim in s3.calls)
+    assert app._KeyIndex("eu-west-1", "rnaseqdatabase").path != idx.path